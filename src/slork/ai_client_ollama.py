@@ -1,7 +1,8 @@
 from dataclasses import dataclass, asdict, field
 from dacite import from_dict
-from urllib import request
-from urllib.error import HTTPError, URLError
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from threading import Lock
+from urllib.parse import urlsplit
 from typing import Any, Optional
 import json
 import socket
@@ -49,6 +50,15 @@ class OllamaClient:
     def __init__(self, settings: OllamaClientSettings):
         self.settings = settings
 
+        # A single HTTP connection is kept open and reused for each request 
+        # (keep-alive), rather than connecting for every chat call.
+        url = urlsplit(settings.base_url)
+        self.use_https = url.scheme == "https"
+        self.host = url.netloc
+        self.base_path = url.path.rstrip("/")
+        self.connection: Optional[HTTPConnection] = None
+        self.connection_lock = Lock()
+
     def chat(self, messages: list[NormalisedAIChatMessage]) -> NormalisedAIChatMessage:
         chat_request = OllamaChatRequest(
             model=self.settings.model,
@@ -56,21 +66,14 @@ class OllamaClient:
         )
         chat_request_json=json.dumps(asdict(chat_request), indent=2)
         print(f"AI REQUEST: {chat_request_json}")
-        req = request.Request(
-            url=f"{self.settings.base_url}/api/chat",
-            data=chat_request_json.encode("utf-8"),
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
         try:
-            with request.urlopen(req, timeout=60) as resp:
-                body = resp.read().decode("utf-8")
+            status, body = self.post("/api/chat", chat_request_json)
         except socket.timeout as exc:
             raise AIChatAPIError("Ollama timed out (try a quicker model?)") from exc
-        except HTTPError as exc:
-            raise AIChatAPIError(f"Ollama HTTP error: {exc.code}") from exc
-        except URLError as exc:
+        except (OSError, HTTPException) as exc:
             raise AIChatAPIError("Ollama is unreachable (is it running?)") from exc
+        if status >= 400:
+            raise AIChatAPIError(f"Ollama HTTP error: {status}")
 
         # Decode response JSON
         print(f"AI RESPONSE: {body}")
@@ -94,3 +97,34 @@ class OllamaClient:
 
     def get_image_generator(self):
         return None         # Not supported in Ollama client
+
+    def post(self, path: str, body: str) -> tuple[int, str]:
+        """POST JSON over the persistent connection. Returns the HTTP status and response body."""
+        with self.connection_lock:
+            reused = self.connection is not None
+            try:
+                return self.send_request(path, body)
+            except (ConnectionError, HTTPException):
+                if not reused:
+                    raise
+
+            # Server closed the idle connection. Reconnect and retry once.
+            return self.send_request(path, body)
+
+    def send_request(self, path: str, body: str) -> tuple[int, str]:
+        if not self.connection:
+            connection_type = HTTPSConnection if self.use_https else HTTPConnection
+            self.connection = connection_type(self.host, timeout=60)
+        try:
+            self.connection.request(
+                "POST", 
+                f"{self.base_path}{path}", 
+                body=body.encode("utf-8"), 
+                headers={"Content-Type": "application/json"}
+            )
+            response = self.connection.getresponse()
+            return response.status, response.read().decode("utf-8")
+        except BaseException:
+            self.connection.close()
+            self.connection = None
+            raise
@@ -10,12 +10,12 @@ from .commands import VALID_VERBS
 
 T = TypeVar("T")
 
-@dataclass
+@dataclass(slots=True)
 class AIPlayerInputResponse:
     execute: Optional[str] = None
     respond: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class AIEnhanceEngineResponse:
     respond: str
 
@@ -1,4 +1,5 @@
 import os
+from functools import cached_property
 from typing import Optional
 from importlib.metadata import version
 from pathlib import Path
@@ -55,7 +56,8 @@ class App:
             image_generator=img_gen, 
             ai_client=ai_client, 
             world=self.world, 
-            world_base_folder=self.world_base_folder)
+            world_base_folder=self.world_base_folder,
+            direct_prompts=args.ai_image_direct_prompt)
 
         print()
         print("**************************************************")
@@ -68,6 +70,10 @@ class App:
             print("Developer mode enabled.")
         print("**************************************************")
 
+    def shutdown(self):
+        if self.images:
+            self.images.shutdown()
+
     def toggle_ai(self) -> ActionResult:
         if self.ai_engine == None:
             return invalid_result("AI is not available. Specify a model using '--ai-model MODELNAME' when launching Slork to enable AI.")
@@ -218,7 +224,7 @@ Developer commands:
         if loc_id not in self.world.locations:
             return invalid_result(f"'{loc_id}' is not a valid location ID")
 
-        self.base_engine.state.location_id = loc_id
+        self.base_engine.state.set_location(loc_id)
         return self.engine.describe_current_location()
 
     def handle_dev_set(self, parts: list[str]) -> ActionResult:
@@ -229,8 +235,7 @@ Developer commands:
         if flag_id not in self.world.flags:
             return invalid_result(f"'{flag_id}' is not a valid flag ID.")
 
-        flags = self.base_engine.state.flags
-        flags.add(flag_id)
+        self.base_engine.state.set_flags([flag_id])
 
         return ok_result(f"Flag '{flag_id}' set.")
 
@@ -242,8 +247,7 @@ Developer commands:
         if flag_id not in self.world.flags:
             return invalid_result(f"'{flag_id}' is not a valid flag ID.")
 
-        flags = self.base_engine.state.flags
-        flags.discard(flag_id)
+        self.base_engine.state.clear_flags([flag_id])
 
         return ok_result(f"Flag '{flag_id}' cleared.")
 
@@ -261,13 +265,10 @@ Developer commands:
 
         # Remove from any locations
         state = self.base_engine.state
-        for _, items in state.location_items.items():
-            if item_id in items:
-                items.remove(item_id)
+        self.base_engine.remove_item_from_locations(item_id)
 
         # Add to inventory
-        if not item_id in state.inventory:
-            state.inventory.append(item_id)
+        state.add_inventory(item_id)
 
         return ok_result(f"'{item_id} ({item.name})' Added to inventory.")
 
@@ -279,8 +280,7 @@ Developer commands:
         if npc_id not in self.world.npcs:
             return invalid_result(f"'{npc_id}' is not a valid NPC ID.")
 
-        if npc_id not in self.base_engine.state.companions:
-            self.base_engine.state.companions.append(npc_id)
+        self.base_engine.state.add_companion(npc_id)
         self.base_engine.move_companions()
 
         return ok_result(f"'{npc_id}' added to companions")
@@ -293,8 +293,7 @@ Developer commands:
         if npc_id not in self.world.npcs:
             return invalid_result(f"'{npc_id}' is not a valid NPC ID.")
 
-        if npc_id in self.base_engine.state.companions:
-            self.base_engine.state.companions.remove(npc_id)
+        self.base_engine.state.remove_companion(npc_id)
 
         return ok_result(f"'{npc_id}' removed from companions")
 
@@ -320,11 +319,11 @@ Developer commands:
             return invalid_result(f"'{i_id}' is not a valid interaction ID.")
 
         state = self.base_engine.state
-        state.completed_interactions.discard(i_id)
+        state.set_interaction_completed(i_id, False)
 
         return ok_result(f"Completed flag cleared from '{i_id}' interaction.")
 
-    @property
+    @cached_property
     def scripts_folder(self) -> Path:
         return get_world_sub_folder_path(self.world_base_folder, "scripts")
 
@@ -348,7 +347,7 @@ Developer commands:
             if line and not line.startswith("#"):
                 output.append(f"> {line}")
                 result = self.handle_raw_command(line)
-                if result.status == ActionStatus.INVALID:
+                if result.status is ActionStatus.INVALID:
                     output.append(f"ERROR: {result.message}")
                     break
                 output.append(result.message)
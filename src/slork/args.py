@@ -2,6 +2,10 @@ import argparse
 from pathlib import Path
 
 def parse_main_args():
+    return create_main_arg_parser().parse_args()
+
+def create_main_arg_parser() -> argparse.ArgumentParser:
+    """Arguments shared by the CLI and web app"""
     parser = argparse.ArgumentParser(description="Slork - Text adventure")
     parser.add_argument(
         "--world",
@@ -45,11 +49,16 @@ def parse_main_args():
         required=False,
         help="Quality parameter to pass to the image generator. E.g. 'low'. Valid values depend on the generator used."
     )
+    parser.add_argument(
+        "--ai-image-direct-prompt",
+        action="store_true",
+        help="Send descriptions straight to the image generator using a fixed template, instead of asking the AI model to write each image prompt. Saves a chat round trip per image."
+    )
     parser.add_argument(
         "--dev",
         type=bool,
         default=False,
         help="Enable developer mode (cheat) commands"
     )
-    return parser.parse_args()
+    return parser
 
@@ -1,10 +1,7 @@
-from typing import Literal
 from .app import App
 from .args import parse_main_args
-from .engine import ActionResult
 from .ai_client import AIChatAPIError
 from .ai_engine import AIResponseFormatError
-from .util import strip_quotes
 
 try:
     import readline
@@ -19,6 +16,14 @@ def main() -> None:
     # Create application
     app = App(args)
 
+    # Run game, then stop background work so quitting doesn't wait for it
+    try:
+        run_game(app)
+    finally:
+        app.shutdown()
+
+def run_game(app: App) -> None:
+
     # Initial location
     try:
         engine_response = app.engine.get_intro()
@@ -1,8 +1,9 @@
+import sys
 from dataclasses import dataclass
-from typing import Optional
+from typing import Final, Optional
 from .util import strip_quotes
 
-VALID_VERBS = {
+VALID_VERBS: Final = {
     "look",
     "inventory",
     "go",
@@ -16,7 +17,7 @@ VALID_VERBS = {
     "give"
 }
 
-VERB_ALIASES = {
+VERB_ALIASES: Final = {
     "l": "look",
     "i": "inventory",
     "inv": "inventory",
@@ -25,7 +26,7 @@ VERB_ALIASES = {
     "pick": "take",
 }
 
-DIRECTION_ALIASES = {
+DIRECTION_ALIASES: Final = {
     "n": "north",
     "s": "south",
     "e": "east",
@@ -49,7 +50,7 @@ DIRECTION_ALIASES = {
     "southwest": "southwest",
 }
 
-@dataclass
+@dataclass(slots=True)
 class ParsedCommand:
     raw: str
     verb: Optional[str] = None
@@ -72,7 +73,7 @@ def parse_command(raw: str) -> ParsedCommand:
         cmd.error = "No command provided."
         return cmd
     
-    tokens = [part.lower() for part in raw.split()]
+    tokens = [part.casefold() for part in raw.split()]
 
     # Process verb
     verb_token = tokens[0]
@@ -89,7 +90,7 @@ def parse_command(raw: str) -> ParsedCommand:
     if verb not in VALID_VERBS:
         cmd.error = f"Unknown verb '{verb_token}'."
         return cmd
-    cmd.verb = verb
+    cmd.verb = sys.intern(verb)
     
     # Intransitive verbs
     if verb in {"look", "inventory"}:
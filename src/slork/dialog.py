@@ -3,7 +3,7 @@ from dataclasses import dataclass, field
 from typing import Optional
 from .logic import Criteria, Effect, ResolvableText
 
-@dataclass
+@dataclass(slots=True)
 class DialogTree:
     criteria: Optional[Criteria] = None                                         # Dialog subtree is only available if criteria is satisfied (not meaningful for root nodes)
     aliases: list[str] = field(default_factory=list)                            # Aliases for main keyword
@@ -1,13 +1,18 @@
 from abc import abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Optional, Protocol
+from typing import Callable, Final, Iterable, Optional, Protocol
 from enum import Enum
+from itertools import chain
 
-from slork.util import add_to_list, describe_string_list, remove_from_list
+from slork.util import describe_string_list
 from .logic import Effect
 from .commands import ParsedCommand, parse_command
 from .world import World, Item, Location, Interaction, Criteria, ResolvableText, DialogTree
 
+# Number of rendered location descriptions kept by each engine
+DESCRIPTION_CACHE_SIZE: Final = 8
+
 class ActionStatus(Enum):
     OK = "ok"
     NO_EFFECT = "no_effect"
@@ -18,12 +23,12 @@ class ImageType(Enum):
     ITEM = "item",
     NPC = "npc"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ImageReference:
     type: ImageType
     id: str
 
-@dataclass
+@dataclass(slots=True)
 class ActionResult:
     status: ActionStatus
     message: str
@@ -38,21 +43,77 @@ def invalid_result(message:str, image_ref: Optional[ImageReference] = None) -> A
 def no_effect_result(message:str, image_ref: Optional[ImageReference] = None) -> ActionResult:
     return ActionResult(status=ActionStatus.NO_EFFECT, message=message, image_ref=image_ref)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ResolveItemResult:
     item: Optional[Item] = None
     item_id: Optional[str] = None
     error: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class GameEngineState:
     location_id: str
-    inventory: list[str]
-    companions: list[str]
+    inventory: dict[str, None]      # Ordered set of item IDs
+    companions: dict[str, None]     # Ordered set of NPC IDs
     flags: set[str]    
-    location_items: dict[str, list[str]]
+    location_items: dict[str, dict[str, None]]    # Ordered set of item IDs per location
     completed_interactions: set[str] = field(default_factory=set)
 
+    # Change counters, which the engine keys its cached output on. Bumped by the
+    # methods below, so changes must be made through them.
+    version: int = field(default=0, compare=False, repr=False)
+    criteria_version: int = field(default=0, compare=False, repr=False)     # Only changes to flags, inventory and companions
+
+    def set_location(self, loc_id: str) -> None:
+        self.location_id = loc_id
+        self.version += 1
+
+    def set_flags(self, flags: Iterable[str]) -> None:
+        self.flags.update(flags)
+        self.criteria_changed()
+
+    def clear_flags(self, flags: Iterable[str]) -> None:
+        self.flags.difference_update(flags)
+        self.criteria_changed()
+
+    def add_inventory(self, item_id: str) -> None:
+        self.inventory[item_id] = None
+        self.criteria_changed()
+
+    def remove_inventory(self, item_id: str) -> None:
+        if item_id in self.inventory:
+            del self.inventory[item_id]
+            self.criteria_changed()
+
+    def add_companion(self, npc_id: str) -> None:
+        self.companions[npc_id] = None
+        self.criteria_changed()
+
+    def remove_companion(self, npc_id: str) -> None:
+        if npc_id in self.companions:
+            del self.companions[npc_id]
+            self.criteria_changed()
+
+    def add_location_item(self, loc_id: str, item_id: str) -> None:
+        self.location_items[loc_id][item_id] = None
+        self.version += 1
+
+    def remove_location_item(self, loc_id: str, item_id: str) -> None:
+        del self.location_items[loc_id][item_id]
+        self.version += 1
+
+    def set_interaction_completed(self, interaction_id: str, completed: bool = True) -> None:
+        # (Only counts as a change if it actually changes)
+        if (interaction_id in self.completed_interactions) != completed:
+            if completed:
+                self.completed_interactions.add(interaction_id)
+            else:
+                self.completed_interactions.discard(interaction_id)
+            self.version += 1
+
+    def criteria_changed(self) -> None:
+        self.version += 1
+        self.criteria_version += 1
+
 class PGameEngine(Protocol):
     @abstractmethod
     def handle_raw_command(self, raw_command: str) -> ActionResult:
@@ -74,14 +135,102 @@ class GameEngine:
     Players can navigate the world using GO, TAKE, EXAMINE and DROP objects or
     perform specifically defined interactions
     """
-    def __init__(self, world:World):
+    def __init__(self, world: World) -> None:
         self.world = world
+
+        # Per-location partitions of state.location_items, kept in sync by
+        # add_location_item/remove_location_item.
+        self._loc_npcs: dict[str, dict[str, None]] = {}
+        self._loc_things: dict[str, dict[str, None]] = {}
+        # Locations holding each item. (Usually one, but a world can place an 
+        # item in more than one location.)
+        self._item_locations: dict[str, dict[str, None]] = {}
+
+        # Location descriptions, keyed by location, verbosity and state.version
+        self._desc_cache: OrderedDict[tuple[str, bool, int], str] = OrderedDict()
+
+        # Criteria results, valid while the state's criteria_version is unchanged
+        self._criteria_cache: dict[Criteria, bool] = {}
+        self._criteria_version = 0
+
         self.state = get_initial_game_state(world)
         self.last_command: Optional[ParsedCommand] = None
         self.dialog_context: Optional[DialogTree] = None
         self.next_dialog_context: Optional[DialogTree] = None
         self.dialog_jump_lookup: dict[str, DialogTree] = world.get_dialog_jump_lookup()
 
+        # Reverse lookup from casefolded noun (item name or alias) to item IDs
+        noun_to_ids: dict[str, list[str]] = {}
+        for item_id, item in world.items.items():
+            for noun in item.nouns:
+                noun_to_ids.setdefault(noun, []).append(item_id)
+        self._noun_to_ids: dict[str, tuple[str, ...]] = {
+            noun: tuple(item_ids) for noun, item_ids in noun_to_ids.items()
+        }
+
+        # Interactions indexed by (verb, item, target), in world file order.
+        # Commands match on the exact target, so an interaction without a target 
+        # (key target None) only matches commands without a target noun.
+        interactions_by_key: dict[tuple[str, str, Optional[str]], list[tuple[str, Interaction]]] = {}
+        for interaction_id, interaction in world.interactions.items():
+            key = (interaction.verb, interaction.item, interaction.target)
+            interactions_by_key.setdefault(key, []).append((interaction_id, interaction))
+        self._interactions_by_key: dict[tuple[str, str, Optional[str]], tuple[tuple[str, Interaction], ...]] = {
+            key: tuple(entries) for key, entries in interactions_by_key.items()
+        }
+
+        # Items each location starts with (i.e. as defined in the world file).
+        # Items in their original location are described by their location_description.
+        self._original_items: dict[str, frozenset[str]] = {
+            loc_id: frozenset(location.items)
+            for loc_id, location in world.locations.items()
+        }
+
+        # Pre-formatted exit descriptions for each location, paired with the 
+        # criteria that must be satisfied for the exit to be listed.
+        self._exit_lines: dict[str, list[tuple[Optional[Criteria], str]]] = {
+            loc_id: [
+                (ex.criteria, f"{direction} - {ex.description}" if ex.description else direction)
+                for direction, ex in location.exits.items()
+            ]
+            for loc_id, location in world.locations.items()
+        }
+
+        # Complete "Exits:" line for locations whose exits are all unconditional
+        self._static_exits_line: dict[str, str] = {
+            loc_id: f"Exits: {', '.join(exit_line for _, exit_line in exit_lines)}"
+            for loc_id, exit_lines in self._exit_lines.items()
+            if exit_lines and all(not criteria for criteria, _ in exit_lines)
+        }
+
+        # Image references are immutable, so one per location/item is shared
+        self._location_image_refs: dict[str, ImageReference] = {
+            loc_id: ImageReference(type=ImageType.LOCATION, id=loc_id)
+            for loc_id in world.locations
+        }
+        self._npc_image_refs: dict[str, ImageReference] = {
+            npc_id: ImageReference(type=ImageType.NPC, id=npc_id)
+            for npc_id in world.npcs
+        }
+        self._item_image_refs: dict[str, ImageReference] = {
+            item_id: ImageReference(type=ImageType.ITEM, id=item_id)
+            for item_id, item in world.items.items()
+            if item.portable
+        }
+
+        # Handlers for built-in verbs, with and without a noun. Other verbs are 
+        # world defined interactions.
+        self._noun_verb_handlers: dict[str, Callable[[str], ActionResult]] = {
+            "go": self.handle_go,
+            "take": self.handle_take,
+            "drop": self.handle_drop,
+            "examine": self.handle_examine,
+        }
+        self._verb_handlers: dict[str, Callable[[], ActionResult]] = {
+            "look": self.describe_current_location,
+            "inventory": self.handle_inventory,
+        }
+
         # Move companions to initial location
         self.move_companions()
 
@@ -94,26 +243,102 @@ class GameEngine:
 
         return result
 
+    @property
+    def state(self) -> GameEngineState:
+        return self._state
+
+    @state.setter
+    def state(self, state: GameEngineState) -> None:
+        self._state = state
+        self.index_location_items()
+
+        # Cached output belongs to the previous state
+        self._desc_cache.clear()
+        self._criteria_cache.clear()
+        self._criteria_version = state.criteria_version
+
+    def index_location_items(self) -> None:
+        """
+        Rebuild the per-location NPC/item partitions and the item -> locations
+        lookup from state.location_items.
+        """
+        npcs_tbl = self.world.npcs
+        self._loc_npcs = {}
+        self._loc_things = {}
+        self._item_locations = {}
+        for loc_id, location_items in self.state.location_items.items():
+            location_npcs = self._loc_npcs[loc_id] = {}
+            location_things = self._loc_things[loc_id] = {}
+            for item_id in location_items:
+                if item_id in npcs_tbl:
+                    location_npcs[item_id] = None
+                else:
+                    location_things[item_id] = None
+                self._item_locations.setdefault(item_id, {})[loc_id] = None
+
+    def index_location_item(self, loc_id: str, item_id: str) -> None:
+        bucket = self._loc_npcs if item_id in self.world.npcs else self._loc_things
+        bucket[loc_id][item_id] = None
+        self._item_locations.setdefault(item_id, {})[loc_id] = None
+
+    def add_location_item(self, loc_id: str, item_id: str) -> None:
+        self.state.add_location_item(loc_id, item_id)
+        self.index_location_item(loc_id, item_id)
+
+    def remove_location_item(self, loc_id: str, item_id: str) -> None:
+        """Remove item from the location, if it is there."""
+        item_locations = self._item_locations.get(item_id)
+        if item_locations is None or loc_id not in item_locations:
+            return
+        del item_locations[loc_id]
+        self.state.remove_location_item(loc_id, item_id)
+        bucket = self._loc_npcs if item_id in self.world.npcs else self._loc_things
+        del bucket[loc_id][item_id]
+
+    def remove_item_from_locations(self, item_id: str) -> None:
+        """Remove item from every location it is in."""
+        for loc_id in list(self._item_locations.get(item_id, ())):
+            self.remove_location_item(loc_id, item_id)
+
     def current_location(self) -> Location:
         return self.world.locations[self.state.location_id]
 
-    def current_location_items(self) -> list[str]:
-        return self.state.location_items[self.state.location_id]
-
     def describe_current_location(self, verbose: bool = False) -> ActionResult:
+        if verbose and self.dialog_context:
+            # Includes dialog choices, which aren't part of the game state
+            description = self.build_location_description(verbose)
+        else:
+            cache_key = (self.state.location_id, verbose, self.state.version)
+            description = self._desc_cache.get(cache_key)
+            if description is not None:
+                self._desc_cache.move_to_end(cache_key)
+            else:
+                description = self.build_location_description(verbose)
+                self._desc_cache[cache_key] = description
+                if len(self._desc_cache) > DESCRIPTION_CACHE_SIZE:
+                    self._desc_cache.popitem(last=False)
+
+        return ActionResult(
+            status=ActionStatus.OK, 
+            message=description,
+            image_ref=self._location_image_refs[self.state.location_id])
+
+    def build_location_description(self, verbose: bool) -> str:
         location = self.current_location()
+
+        # Helpers append directly to a single list of lines, which is joined once
         lines = [
             location.name, 
             "",
             location.description.rstrip(), 
-            *self.describe_npcs(verbose),
-            *self.describe_items(verbose),
-            *self.describe_exits(verbose),
         ]
+        self.describe_npcs(lines, location, verbose)
+        self.describe_items(lines, location, verbose)
+        self.describe_exits(lines, location, verbose)
 
         # Player inventory
         if verbose:
-            lines.extend(self.describe_inventory())
+            self.describe_inventory(lines)
             if self.dialog_context:
                 responses = self.available_dialog_responses(self.dialog_context)
                 if responses:
@@ -124,64 +349,53 @@ class GameEngine:
                     lines.append( "    DIALOG IN PROGRESS")
                     lines.append(f"    DIALOG CHOICES: {', '.join(choices)}")
 
-        description = "\n".join(lines)
-        return ActionResult(
-            status=ActionStatus.OK, 
-            message=description,
-            image_ref=ImageReference(
-                type=ImageType.LOCATION,
-                id=self.state.location_id
-            ))
+        return "\n".join(lines)
+
+    def describe_npcs(self, lines: list[str], location: Location, verbose: bool) -> None:
+        location_npcs = self._loc_npcs[self.state.location_id]
+        companions = self.state.companions
+        if not location_npcs and not companions:
+            return
 
-    def describe_npcs(self, verbose: bool) -> list[str]:
-        lines = []
+        items_tbl = self.world.items
+        npcs_tbl = self.world.npcs
+        original_items = self._original_items[self.state.location_id]
 
         # NPCs
-        companion_npcs = [
-            (npc_id, self.world.items[npc_id], self.world.npcs[npc_id])
-            for npc_id in self.state.companions
-        ]
-        other_npcs = [ 
-            (item_id, self.world.items[item_id], self.world.npcs[item_id])
-            for item_id in self.current_location_items()
-            if self.is_npc(item_id) and item_id not in self.state.companions
-        ]
-        for item_id, item, npc in other_npcs:
-            if item.location_description and item_id in self.current_location().items:        # Item in its original location
+        other_npcs: list[str] = []      # Only collected for the verbose NPC info
+        for item_id in location_npcs:
+            if item_id in companions:
+                continue
+            if verbose:
+                other_npcs.append(item_id)
+            item = items_tbl[item_id]
+            if item.location_description and item_id in original_items:        # Item in its original location
                 lines.append(self.resolve_text(item.location_description))
             else:
                 lines.append(f"{item.name} is here.")
 
-        if companion_npcs:
-            companion_names = [item.name for _, item, _ in companion_npcs]
-            lines.append(f"Your companions: {', '.join(companion_names)}")
+        if companions:
+            companion_names = ', '.join(items_tbl[npc_id].name for npc_id in companions)
+            lines.append(f"Your companions: {companion_names}")
 
         # NPC info
-        npcs = [*companion_npcs, *other_npcs]
-        if verbose and npcs:
+        # (Early return above guarantees there is at least one NPC to list)
+        if verbose:
             lines.append("Present NPCs:")
-            for item_id, item, npc in npcs:
+            for item_id in chain(companions, other_npcs):
+                item = items_tbl[item_id]
+                npc = npcs_tbl[item_id]
                 lines.append(f"  {item.name}")
                 if npc.persona:
                     lines.append(f"    Persona: {npc.persona}")
                 if npc.quest_hook:
                     lines.append(f"    Quest hook: {npc.quest_hook}")
                 if npc.sample_lines:
-                    quoted_lines = [f'"{sample_line}"' for sample_line in npc.sample_lines]
-                    lines.append(f"    Sample lines: {', '.join(quoted_lines)}")
+                    quoted_lines = ', '.join(f'"{sample_line}"' for sample_line in npc.sample_lines)
+                    lines.append(f"    Sample lines: {quoted_lines}")
                 
                 # Look for available talk interaction
-                talk_interaction = next( 
-                    (
-                        (interaction_id, interaction)
-                        for interaction_id, interaction in self.world.interactions.items()
-                        if (
-                            self.matches_interaction(interaction, "talk", item_id, None) 
-                            and self.is_criteria_satisfied(interaction.criteria)
-                        )
-                    ),
-                    None
-                )
+                talk_interaction = self.find_interaction("talk", item_id, None)
                 if talk_interaction:
                     interaction_id, interaction = talk_interaction
 
@@ -194,55 +408,48 @@ class GameEngine:
                     lines.append("    TALK INTERACTION: Yes")
                 else:
                     lines.append("    TALK INTERACTION: No")
-        
-        return lines
 
-    def describe_items(self, verbose: bool) -> list[str]:
-        lines = []
+    def describe_items(self, lines: list[str], location: Location, verbose: bool) -> None:
+        location_things = self._loc_things[self.state.location_id]
+        if not location_things:
+            return
+
+        items_tbl = self.world.items
+        original_items = self._original_items[self.state.location_id]
 
         # Items
-        for item_id in self.current_location_items():
-            item = self.world.items[item_id]
-            if not self.is_npc(item_id):
-                if item.location_description and item_id in self.current_location().items:
-                    lines.append(self.resolve_text(item.location_description))
-                elif item.portable:
-                    lines.append(f"There is a {item.name} here.")
+        for item_id in location_things:
+            item = items_tbl[item_id]
+            if item.location_description and item_id in original_items:
+                lines.append(self.resolve_text(item.location_description))
+            elif item.portable:
+                lines.append(f"There is a {item.name} here.")
 
-        return lines
-
-    def describe_exits(self, verbose: bool) -> list[str]:
-        location = self.current_location()
-        lines = []
+    def describe_exits(self, lines: list[str], location: Location, verbose: bool) -> None:
 
         # Exits
-        exit_descriptions = []
-        for direction, ex in location.exits.items():
-            if self.is_criteria_satisfied(ex.criteria):
-                exit_description = direction
-                if ex.description:
-                    exit_description += f" - {ex.description}"
-                exit_descriptions.append(exit_description)
-        if exit_descriptions:
-            lines.append(f"Exits: {', '.join(exit_descriptions)}")
-
-        return lines
-
-    def describe_inventory(self) -> list[str]:
-        lines = []
+        static_line = self._static_exits_line.get(self.state.location_id)
+        if static_line:
+            lines.append(static_line)
+            return
 
-        inventory_items = [
-            self.world.items[item_id].name
-            for item_id in self.state.inventory
+        exit_descriptions = [
+            exit_line
+            for criteria, exit_line in self._exit_lines[self.state.location_id]
+            if self.is_criteria_satisfied(criteria)
         ]
-        lines.append(f"Inventory: { ', '.join(inventory_items) if inventory_items else 'Nothing' }")
+        if exit_descriptions:
+            lines.append(f"Exits: {', '.join(exit_descriptions)}")
 
-        return lines
+    def describe_inventory(self, lines: list[str]) -> None:
+        items_tbl = self.world.items
+        inventory_items = ', '.join(items_tbl[item_id].name for item_id in self.state.inventory) if self.state.inventory else 'Nothing'
+        lines.append(f"Inventory: {inventory_items}")
     
     def handle_raw_command(self, raw_command: str) -> ActionResult:
         self.next_dialog_context = None
         result = self.handle_raw_command_internal(raw_command)
-        if result.status != ActionStatus.INVALID:
+        if result.status is not ActionStatus.INVALID:
             self.dialog_context = self.next_dialog_context
         return result
 
@@ -265,42 +472,31 @@ class GameEngine:
 
     def handle_command(self, command: ParsedCommand) -> ActionResult:
 
-        # Note: Command parser ensures specific verbs always have a noun
-
-        match command.verb:
-            case "look":
-                return self.describe_current_location()
-            case "inventory":
-                return self.handle_inventory()
-            case "go":
-                assert command.main_noun is not None
-                return self.handle_go(command.main_noun)
-            case "take":
-                assert command.main_noun is not None
-                return self.handle_take(command.main_noun)
-            case "drop":
-                assert command.main_noun is not None
-                return self.handle_drop(command.main_noun)
-            case "examine":
-                assert command.main_noun is not None
-                return self.handle_examine(command.main_noun)
+        verb = command.verb
+        handler = self._noun_verb_handlers.get(verb)
+        if handler:
+            # Note: Command parser ensures specific verbs always have a noun
+            assert command.main_noun is not None
+            return handler(command.main_noun)
+        no_noun_handler = self._verb_handlers.get(verb)
+        if no_noun_handler:
+            return no_noun_handler()
 
         return self.handle_interaction(command)  
 
     def handle_go(self, direction: str) -> ActionResult:
 
         # Location must have corresponding exit
-        location = self.current_location()
-        if direction not in location.exits:
+        exit = self.current_location().exits.get(direction)
+        if exit is None:
             return invalid_result(f"You cannot go {direction}.")    
-        exit = location.exits[direction]
 
         # Flag criteria must be satisfied
         if not self.is_criteria_satisfied(exit.criteria):
             return invalid_result(exit.blocked_description if exit.blocked_description else f"You cannot go {direction}.")
 
         # Move to new location
-        self.state.location_id = exit.to
+        self.state.set_location(exit.to)
         self.move_companions()
         
         return self.describe_current_location()
@@ -321,20 +517,17 @@ class GameEngine:
             return no_effect_result(f"You cannot take the {item.name}.")
         
         # Remove from location and add to inventory
-        self.current_location_items().remove(item_id)
-        self.state.inventory.append(item_id)
+        self.remove_location_item(self.state.location_id, item_id)
+        self.state.add_inventory(item_id)
 
         return ok_result(f"You took the {item.name}.")
 
     def handle_inventory(self) -> ActionResult:
 
         # Get inventory item names
-        inventory_items = [
-            self.world.items[item_id].name
-            for item_id in self.state.inventory
-        ]
-
-        message = ",\n".join(inventory_items) if inventory_items else "You carry nothing."
+        items_tbl = self.world.items
+        inventory = self.state.inventory
+        message = ",\n".join(items_tbl[item_id].name for item_id in inventory) if inventory else "You carry nothing."
 
         return ok_result(message)
 
@@ -350,8 +543,8 @@ class GameEngine:
         item = result.item
 
         # Remove from inventory and add to location
-        self.state.inventory.remove(item_id)
-        self.current_location_items().append(item_id)
+        self.state.remove_inventory(item_id)
+        self.add_location_item(self.state.location_id, item_id)
 
         return ok_result(f"You dropped the {item.name}")
 
@@ -440,14 +633,14 @@ class GameEngine:
 
         # NPC?
         if item_result.item_id in self.world.npcs:
-            return ImageReference(type=ImageType.NPC, id=item_result.item_id)
+            return self._npc_image_refs[item_result.item_id]
 
         # Otherwise must be a portable item, as non-portable items are part of
         # the location description and therefore should appear in the location 
         # image. (So rendering a second image would likely introduce 
         # inconsistency.)
         if item_result.item.portable:
-            return ImageReference(type=ImageType.ITEM, id=item_result.item_id)
+            return self._item_image_refs[item_result.item_id]
 
     def handle_interaction(self, command: ParsedCommand) -> ActionResult:
         # Command parser ensures all commands (apart from "look" and "inventory")
@@ -474,14 +667,7 @@ class GameEngine:
             target_id = target_result.item_id
 
         # Search for matching interaction
-        interaction_entry: Optional[tuple[str, Interaction]] = next(
-            (
-                (interaction_id, interaction) 
-                for interaction_id, interaction in self.world.interactions.items()
-                if self.matches_interaction(interaction, command.verb, item_id, target_id)
-            ),
-            None
-        )
+        interaction_entry = self.find_interaction(command.verb, item_id, target_id)
 
         # No match?
         if not interaction_entry:
@@ -506,25 +692,22 @@ class GameEngine:
             assert message_text        
             return ok_result(message_text)
 
-    def has_required_flags(self, required_flags) -> bool:
-        return all(flag in self.state.flags for flag in required_flags)
-
     def resolve_item(self, noun: str, *, include_location: bool = False, include_inventory: bool = False) -> ResolveItemResult:
 
-        # Determine items to search
-        item_ids: list[str] = []
-        
-        if (include_location):
-            item_ids.extend(self.current_location_items())
-        
-        if (include_inventory):
-            item_ids.extend(self.state.inventory)
-
-        # Filter to matching items
-        matches = [ 
+        # Look up items matching the noun, then filter to those in scope.
+        # (Index keys are casefolded. The parser already casefolds nouns, so 
+        # try the noun as given before normalising for other callers.)
+        candidate_ids = self._noun_to_ids.get(noun)
+        if candidate_ids is None:
+            candidate_ids = self._noun_to_ids.get(noun.casefold(), ())
+        loc_id = self.state.location_id
+        item_locations = self._item_locations
+        inventory = self.state.inventory
+        matches = [
             item_id
-            for item_id in item_ids
-            if self.item_matches_noun(self.world.items[item_id], noun)
+            for item_id in candidate_ids
+            if (include_location and loc_id in item_locations.get(item_id, ()))
+            or (include_inventory and item_id in inventory)
         ]
 
         # Must be exactly one
@@ -543,19 +726,15 @@ class GameEngine:
             item=self.world.items[matches[0]]
         )
 
-    def item_matches_noun(self, item: Item, noun: str):
-        return item.name.lower() == noun or noun in (alias.lower() for alias in item.aliases)
+    def find_interaction(self, verb: str, item_id: str, target_id: Optional[str]) -> Optional[tuple[str, Interaction]]:
 
-    def matches_interaction(self, interaction: Interaction, verb: str, item_id: str, target_id: Optional[str]) -> bool:
+        # Command must match (via index), and flag criteria must be satisfied
+        for entry in self._interactions_by_key.get((verb, item_id, target_id), ()):
+            if self.is_criteria_satisfied(entry[1].criteria):
+                return entry
+        return None
 
-        # Command must match
-        if interaction.verb != verb or interaction.item != item_id or interaction.target != target_id:
-            return False
-
-        # Flag criteria must be satisfied
-        return self.is_criteria_satisfied(interaction.criteria)
-
-    def apply_interaction(self, interaction_id: str, interaction: Interaction):
+    def apply_interaction(self, interaction_id: str, interaction: Interaction) -> None:
 
         # Apply state changes        
         self.apply_effect(interaction.effect)
@@ -564,42 +743,59 @@ class GameEngine:
         if interaction.consumes:
 
             # Remove from inventory
-            if interaction.item in self.state.inventory:
-                self.state.inventory.remove(interaction.item)
+            self.state.remove_inventory(interaction.item)
 
             # Remove from location
-            location_items = self.current_location_items()
-            if interaction.item in location_items:
-                location_items.remove(interaction.item)
+            self.remove_location_item(self.state.location_id, interaction.item)
 
         # Mark as complete
-        self.state.completed_interactions.add(interaction_id)
+        self.state.set_interaction_completed(interaction_id)
     
-    def move_companions(self):
-        # Remove from all locations
-        for _, location_items in self.state.location_items.items():
-            remove_from_list(location_items, self.state.companions)
-
-        # Add to current location
-        add_to_list(self.current_location_items(), self.state.companions)
-
-    def is_npc(self, item_id: str) -> bool:
-        return item_id in self.world.npcs
-
-    @property
-    def npcs(self) -> list[str]:
-        return [ npc_id for npc_id, _ in self.world.npcs.items() ]
+    def move_companions(self) -> None:
+        # Move each companion from its tracked location(s) to the current 
+        # location. Only the companion's previous locations are touched - 
+        # O(companions) rather than a scan of every location.
+        loc_id = self.state.location_id
+        for npc_id in self.state.companions:
+            old_loc_ids = self._item_locations.get(npc_id)
+            if old_loc_ids is not None and old_loc_ids.keys() == {loc_id}:
+                continue
+
+            # (Companion may not be in any location yet, e.g. not yet placed in 
+            # the world)
+            self.remove_item_from_locations(npc_id)
+            self.add_location_item(loc_id, npc_id)
 
     def is_criteria_satisfied(self, criteria: Optional[Criteria]) -> bool:
         if not criteria:
             return True
 
-        has_required_flags = criteria.requires_flags.issubset(self.state.flags)
-        is_blocked_by_flags = not criteria.blocking_flags.isdisjoint(self.state.flags)
-        has_required_inventory = criteria.requires_inventory.issubset(set(self.state.inventory))
-        has_required_companions = criteria.requires_companions.issubset(set(self.state.companions))
-
-        return has_required_flags and not is_blocked_by_flags and has_required_inventory and has_required_companions
+        # Cached results are discarded once flags, inventory or companions change
+        if self._criteria_version != self.state.criteria_version:
+            self._criteria_cache.clear()
+            self._criteria_version = self.state.criteria_version
+
+        satisfied = self._criteria_cache.get(criteria)
+        if satisfied is None:
+            satisfied = self.evaluate_criteria(criteria)
+            self._criteria_cache[criteria] = satisfied
+        return satisfied
+
+    def evaluate_criteria(self, criteria: Criteria) -> bool:
+        # Checks return as soon as one fails. Empty sets are skipped without 
+        # touching the game state.
+        # Inventory and companions are dicts, so compare against their keys 
+        # views. (frozenset.issubset(dict) would copy the dict into a new set.)
+        flags = self.state.flags
+        if criteria.requires_flags and not criteria.requires_flags.issubset(flags):
+            return False
+        if criteria.blocking_flags and not criteria.blocking_flags.isdisjoint(flags):
+            return False
+        if criteria.requires_inventory and not self.state.inventory.keys() >= criteria.requires_inventory:
+            return False
+        if criteria.requires_companions and not self.state.companions.keys() >= criteria.requires_companions:
+            return False
+        return True
 
     def resolve_text(self, text: ResolvableText) -> str:
 
@@ -615,17 +811,23 @@ class GameEngine:
 
         raise RuntimeError("ResolvableText did not resolve to a string.")
 
-    def apply_effect(self, effect: Optional[Effect]):
+    def apply_effect(self, effect: Optional[Effect]) -> None:
         if not effect:
             return
 
         # Apply flag changes
-        self.state.flags.update(effect.set_flags)
-        self.state.flags.difference_update(effect.clear_flags)
-        add_to_list(self.state.inventory, effect.add_inventory)
-        remove_from_list(self.state.inventory, effect.remove_inventory)
-        add_to_list(self.state.companions, effect.add_companions)
-        remove_from_list(self.state.companions, effect.remove_companions)
+        if effect.set_flags:
+            self.state.set_flags(effect.set_flags)
+        if effect.clear_flags:
+            self.state.clear_flags(effect.clear_flags)
+        for item_id in effect.add_inventory:
+            self.state.add_inventory(item_id)
+        for item_id in effect.remove_inventory:
+            self.state.remove_inventory(item_id)
+        for npc_id in effect.add_companions:
+            self.state.add_companion(npc_id)
+        for npc_id in effect.remove_companions:
+            self.state.remove_companion(npc_id)
 
     def available_dialog_responses(self, dialog: DialogTree) -> list[tuple[str, DialogTree]]:
         return [
@@ -637,11 +839,11 @@ class GameEngine:
 def get_initial_game_state(world: World) -> GameEngineState:
     return GameEngineState(
         location_id=world.world.start,
-        inventory=world.world.initial_inventory.copy(),
-        companions=world.world.initial_companions.copy(),
+        inventory=dict.fromkeys(world.world.initial_inventory),
+        companions=dict.fromkeys(world.world.initial_companions),
         flags=set(),
         location_items={
-            loc_id: location.items.copy()
+            loc_id: dict.fromkeys(location.items)
             for loc_id, location in world.locations.items()
         },
         completed_interactions=set()
@@ -1,54 +1,254 @@
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from threading import Lock, get_ident
 from typing import Optional, Literal
 
-from slork.persistence import get_world_sub_folder_path
+from slork.persistence import get_world_sub_folder_path, write_file_atomic
 from .engine import ImageReference, ImageType, Location
 from .world import World
+from .logic import ResolvableText
 from .ai_client import NormalisedAIChatMessage, AIChatClient, AIImageGen
 
-@dataclass
+@dataclass(frozen=True)
 class AIPrompts:
     create_location_prompt: str
     create_item_prompt: str
     create_npc_prompt: str
 
+    # Used instead of the above when prompts are sent directly to the image 
+    # generator (without an AI chat call to create them)
+    direct_location_prompt: str
+    direct_item_prompt: str
+    direct_npc_prompt: str
+
+@dataclass(frozen=True)
+class ImageSource:
+    """The text an image is generated from"""
+    name: str
+    system_prompt: str          # For the AI chat call that writes the image prompt
+    direct_prompt: str          # Template used instead in direct prompt mode
+    description: str
+
 class ImageService:
     """
     Uses AI image generation to create and return images for locations,
     items, and NPCs
     """
-    def __init__(self, image_generator: Optional[AIImageGen], ai_client: Optional[AIChatClient], world: World, world_base_folder: Path):
+    def __init__(self, image_generator: Optional[AIImageGen], ai_client: Optional[AIChatClient], world: World, world_base_folder: Path, direct_prompts: bool = False):
         self.image_generator = image_generator
         self.ai_client = ai_client
+        self.direct_prompts = direct_prompts
         self.world = world
         self.folder = get_world_sub_folder_path(world_base_folder, "images")
         self.img_gen_prompt_common: Optional[str] = world.ai_guidance.image_generation if world.ai_guidance else None
         self.prompts = create_ai_prompts(self.img_gen_prompt_common)
 
+        # Background generation of images the player is likely to need next.
+        # Only useful if images can be generated.
+        self.prefetch_pool: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-prefetch")
+            if image_generator and ai_client else None
+        )
+        self.prefetch_lock = Lock()
+        self.prefetching: dict[Path, Future] = {}
+
+        # Fingerprint of the source text each generated image was created from
+        # (keyed by image filename). Used to detect images that are out of date.
+        self.cache_folder = self.folder / "cache"
+        self.fingerprints_path = self.folder / "fingerprints.json"
+        self.fingerprints: dict[str, str] = load_fingerprints(self.fingerprints_path)
+        self.fingerprints_lock = Lock()
+
+        # Generations in progress, by cache key (so each is only generated once)
+        self.generating: dict[str, Future] = {}
+        self.generating_lock = Lock()
+
+        # Image file path for each (image type, id)
+        self.image_paths: dict[tuple[str, str], Path] = {}
+
+        # Image prompts written by the AI chat model, keyed by (system prompt, description)
+        self.chat_prompt_cache: dict[tuple[str, str], str] = {}
+
+    def shutdown(self):
+        """
+        Cancel queued background generation. (Otherwise the interpreter waits 
+        for every queued image to be generated before exiting.)
+        """
+        if self.prefetch_pool:
+            self.prefetch_pool.shutdown(wait=False, cancel_futures=True)
+
     def get_image(self, image_ref: ImageReference) -> Optional[Path]:
         match image_ref.type:
             case ImageType.LOCATION:
-                return self.get_location_image(image_ref.id)    
+                # Queue nearby images first, so they are generated concurrently
+                # with the location image.
+                self.prefetch_nearby_images(image_ref.id)
+                return self.get_location_image(image_ref.id)
             case ImageType.ITEM:
                 return self.get_item_image(image_ref.id)
             case ImageType.NPC:
                 return self.get_npc_image(image_ref.id)
 
     def get_location_image(self, loc_id: str) -> Path:
-        image_path = self.get_image_path("location", loc_id)
-        if not image_path.exists():
-            self.generate_location_image(loc_id, image_path)
+        return self.get_or_create_image(self.get_image_path("location", loc_id), self.get_location_image_source(loc_id))
+
+    def get_npc_image(self, npc_id: str) -> Path:
+        return self.get_or_create_image(self.get_image_path("npc", npc_id), self.get_npc_image_source(npc_id))
+
+    def get_item_image(self, item_id: str) -> Path:
+        return self.get_or_create_image(self.get_image_path("item", item_id), self.get_item_image_source(item_id))
+
+    def get_or_create_image(self, image_path: Path, source: Optional[ImageSource]) -> Path:
+        self.wait_for_prefetch(image_path)       # (May be mid-write)
+        if source and not self.is_image_current(image_path, source):
+            self.create_image(image_path, source)
         return image_path
 
-    def get_image_path(self, image_type: Literal["location", "npc", "item"], id: str) -> Path:
-        filename = Path(f"{image_type}_{id}").with_suffix(".png")
-        return self.folder / filename
+    def is_image_current(self, image_path: Path, source: ImageSource) -> bool:
+        """
+        Whether the image exists and was generated from the current source text.
+        Images without a recorded fingerprint (e.g. shipped with the world) are
+        assumed current, as are all existing images if new ones can't be generated.
+        """
+        if not image_path.exists():
+            return False
+        if not self.can_generate():
+            return True
+        recorded = self.fingerprints.get(image_path.name)
+        return recorded is None or recorded == self.get_fingerprint(source)
+
+    def can_generate(self) -> bool:
+        return self.image_generator is not None and self.ai_client is not None
 
-    def generate_location_image(self, loc_id: str, image_path: Path):
+    def create_image(self, image_path: Path, source: ImageSource):
         if not self.image_generator or not self.ai_client:
             return
 
+        # Generated images are cached by the generator's input, so identical 
+        # input is only generated once. The cached file is then copied to the 
+        # image's own path.
+        fingerprint = self.get_fingerprint(source)
+        cached_path = self.generate_once(self.get_cache_key(source), source)
+        copy_file_atomic(cached_path, image_path)
+
+        # Record the fingerprint. (Writes are serialised, and atomic so the file 
+        # is never left half written.)
+        with self.fingerprints_lock:
+            self.fingerprints[image_path.name] = fingerprint
+            write_file_atomic(self.fingerprints_path, json.dumps(self.fingerprints, indent=2, sort_keys=True))
+
+    def generate_once(self, cache_key: str, source: ImageSource) -> Path:
+        """
+        Generate the image into the cache folder, unless it is already there. If 
+        another thread is already generating it (e.g. a prefetch), wait for that
+        instead of generating it again.
+        """
+        with self.generating_lock:
+            future = self.generating.get(cache_key)
+            is_owner = future is None
+            if is_owner:
+                future = self.generating[cache_key] = Future()
+        assert future is not None
+        if not is_owner:
+            return future.result()
+
+        try:
+            cached_path = self.cache_folder / f"{cache_key}.png"
+            if not cached_path.exists():
+                assert self.image_generator is not None
+                prompt = self.get_image_gen_prompt(source.system_prompt, source.direct_prompt, source.description)
+                print(f"(Generating '{source.name}' image...)")
+                self.cache_folder.mkdir(exist_ok=True)
+
+                # Generate to a temporary file, so the cached file only ever 
+                # appears complete (and a failed generation leaves nothing behind)
+                temp_path = cached_path.with_name(f"{cache_key}.{get_ident()}.tmp.png")
+                try:
+                    self.image_generator.generate_png(prompt, temp_path)
+                    os.replace(temp_path, cached_path)
+                finally:
+                    temp_path.unlink(missing_ok=True)
+            future.set_result(cached_path)
+            return cached_path
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self.generating_lock:
+                del self.generating[cache_key]
+
+    def get_fingerprint(self, source: ImageSource) -> str:
+        # Identifies the world text the image depicts. (Not how the prompt is 
+        # built, so switching prompt modes doesn't invalidate every image.)
+        key = "\n".join([source.description, self.img_gen_prompt_common or ""])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    def get_cache_key(self, source: ImageSource) -> str:
+        # Identifies the generator's input. In chat mode that is the chat 
+        # model's input, as its output differs from call to call.
+        if self.direct_prompts:
+            key = "\n".join(["direct", source.direct_prompt, source.description, self.img_gen_prompt_common or ""])
+        else:
+            key = "\n".join(["chat", source.system_prompt, source.description, self.img_gen_prompt_common or ""])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    def prefetch_nearby_images(self, loc_id: str):
+        """
+        Start generating images for the locations reachable from this one, and 
+        the NPCs and portable items placed here, in the background.
+        """
+        if not self.prefetch_pool:
+            return
+
+        location = self.world.locations[loc_id]
+        for exit in location.exits.values():
+            self.prefetch(self.get_image_path("location", exit.to), self.get_location_image_source(exit.to))
+        for item_id in location.items:
+            if item_id in self.world.npcs:
+                self.prefetch(self.get_image_path("npc", item_id), self.get_npc_image_source(item_id))
+            elif self.world.items[item_id].portable:
+                self.prefetch(self.get_image_path("item", item_id), self.get_item_image_source(item_id))
+
+    def prefetch(self, image_path: Path, source: Optional[ImageSource]):
+        assert self.prefetch_pool is not None
+        if not source or self.is_image_current(image_path, source):
+            return
+        with self.prefetch_lock:
+            if image_path in self.prefetching:
+                return
+            future = self.prefetch_pool.submit(self.create_image, image_path, source)
+            self.prefetching[image_path] = future
+        future.add_done_callback(lambda _: self.prefetch_done(image_path))
+
+    def prefetch_done(self, image_path: Path):
+        with self.prefetch_lock:
+            self.prefetching.pop(image_path, None)
+
+    def wait_for_prefetch(self, image_path: Path):
+        """Wait for a background generation of the image, if there is one."""
+        with self.prefetch_lock:
+            future = self.prefetching.get(image_path)
+        if future:
+            try:
+                future.result()
+            except Exception:
+                pass        # Caller falls back to generating the image itself
+
+    def get_image_path(self, image_type: Literal["location", "npc", "item"], id: str) -> Path:
+        key = (image_type, id)
+        path = self.image_paths.get(key)
+        if path is None:
+            filename = Path(f"{image_type}_{id}").with_suffix(".png")
+            path = self.image_paths[key] = self.folder / filename
+        return path
+
+    def get_location_image_source(self, loc_id: str) -> ImageSource:
         location = self.world.locations[loc_id]
         description = f"""\
 LOCATION: {location.name}
@@ -57,61 +257,56 @@ DESCRIPTION: {self.get_location_description(location)}
         if location.exits:
             description += f"EXITS: {', '.join([f'{dir} - {exit.description}' for dir, exit in location.exits.items()])}"
 
-        prompt = self.get_image_gen_prompt(
-            self.prompts.create_location_prompt,
-            description
+        return ImageSource(
+            name=location.name,
+            system_prompt=self.prompts.create_location_prompt,
+            direct_prompt=self.prompts.direct_location_prompt,
+            description=description
         )
-        print(f"(Generating '{location.name}' image...)")
-        self.image_generator.generate_png(prompt, image_path)
     
-    def get_image_gen_prompt(self, system_prompt: str, description: str) -> str:
+    def get_image_gen_prompt(self, system_prompt: str, direct_prompt: str, description: str) -> str:
         assert(self.ai_client is not None)
+
+        # Direct mode skips the chat round trip and sends a fixed template
+        if self.direct_prompts:
+            image_gen_prompt = f"{direct_prompt}{description}"
+            if self.img_gen_prompt_common:
+                image_gen_prompt += f"\n{self.img_gen_prompt_common}"
+            return image_gen_prompt
         
-        # Build messages for chat api call
-        ai_messages: list[NormalisedAIChatMessage] = [
-            NormalisedAIChatMessage("system", system_prompt),
-            NormalisedAIChatMessage("user", description)
-        ]
+        # Reuse the chat model's prompt if this description has been seen before
+        cache_key = (system_prompt, description)
+        image_gen_prompt = self.chat_prompt_cache.get(cache_key)
+        if image_gen_prompt is None:
+            # Build messages for chat api call
+            ai_messages: list[NormalisedAIChatMessage] = [
+                NormalisedAIChatMessage("system", system_prompt),
+                NormalisedAIChatMessage("user", description)
+            ]
+
+            # Call AI chat endpoint
+            ai_chat_response = self.ai_client.chat(ai_messages)
+            image_gen_prompt = ai_chat_response.content
+            self.chat_prompt_cache[cache_key] = image_gen_prompt
 
-        # Call AI chat endpoint
-        ai_chat_response = self.ai_client.chat(ai_messages)
-        image_gen_prompt = ai_chat_response.content
         if self.img_gen_prompt_common:
             image_gen_prompt += f". {self.img_gen_prompt_common}"
         return image_gen_prompt
 
-    def get_npc_image(self, npc_id: str) -> Path:
-        image_path = self.get_image_path("npc", npc_id)
-        if not image_path.exists():
-            self.generate_npc_image(npc_id, image_path)
-        return image_path
-
-    def generate_npc_image(self, npc_id: str, image_path: Path):
-        if not self.image_generator or not self.ai_client:
-            return
-
+    def get_npc_image_source(self, npc_id: str) -> ImageSource:
         item = self.world.items[npc_id]
         npc = self.world.npcs[npc_id]
-        prompt = self.get_image_gen_prompt(
-            self.prompts.create_npc_prompt,
-            f"""\
+        return ImageSource(
+            name=item.name,
+            system_prompt=self.prompts.create_npc_prompt,
+            direct_prompt=self.prompts.direct_npc_prompt,
+            description=f"""\
 CHARACTER: {item.name}
 DESCRIPTION: {item.description}
 PERSONA: {npc.persona}
 """)
-        print(f"(Generating '{item.name}' image...)")
-        self.image_generator.generate_png(prompt, image_path)        
-
-    def get_item_image(self, item_id: str) -> Path:
-        image_path = self.get_image_path("item", item_id)
-        if not image_path.exists():
-            self.generate_item_image(item_id, image_path)
-        return image_path
-
-    def generate_item_image(self, item_id: str, image_path: Path) -> Optional[Path]:
-        if not self.image_generator or not self.ai_client:
-            return
 
+    def get_item_image_source(self, item_id: str) -> Optional[ImageSource]:
         item = self.world.items[item_id]
 
         # Non-portable items with no location_description are expected to be 
@@ -121,15 +316,14 @@ PERSONA: {npc.persona}
         if not item.portable and not item.location_description:
             return None
 
-        prompt = self.get_image_gen_prompt(
-            self.prompts.create_item_prompt,
-            f"""\
+        return ImageSource(
+            name=item.name,
+            system_prompt=self.prompts.create_item_prompt,
+            direct_prompt=self.prompts.direct_item_prompt,
+            description=f"""\
 ITEM: {item.name}
 DESCRIPTION: {item.description}
 """)
-        print(f"(Generating '{item.name}' image...)")
-        self.image_generator.generate_png(prompt, image_path)
-        return image_path
 
     def get_location_description(self, location: Location) -> str:
         
@@ -139,7 +333,7 @@ DESCRIPTION: {item.description}
             for item_id in location.items
         ]
         item_descriptions = [
-            item.location_description
+            get_default_text(item.location_description)
             for item in items
             if not item.portable and item.location_description
         ]
@@ -149,6 +343,36 @@ DESCRIPTION: {item.description}
         ]
         return '\n'.join(lines)
 
+def load_fingerprints(path: Path) -> dict[str, str]:
+    # A missing or damaged file just means images are treated as unrecorded
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as exc:
+        print(f"(Ignoring unreadable image fingerprints file {path}: {exc})")
+        return {}
+
+def copy_file_atomic(source_path: Path, dest_path: Path):
+    """Copy via a temporary file, so readers never see a partly written file"""
+    temp_path = dest_path.with_name(f"{dest_path.stem}.{get_ident()}.tmp{dest_path.suffix}")
+    try:
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, dest_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+def get_default_text(text: ResolvableText) -> str:
+    """
+    Text to use for images, which don't depend on game state. For conditional
+    text this is the final clause, which applies when no criteria match.
+    """
+    if isinstance(text, str):
+        return text
+    last_clause = text[-1]
+    return last_clause if isinstance(last_clause, str) else last_clause.text
+
+@lru_cache(maxsize=8)
 def create_ai_prompts(prompt_common: Optional[str]) -> AIPrompts:
 
     prompt_common_guidance = f"""
@@ -197,5 +421,18 @@ Images should illustrate the content from the original text.
 
 Do NOT invoke tools, functions, or tool calls.
 Output ONLY the prompt to send to the AI image creator.
+""",
+        direct_location_prompt="""\
+A supplementary image for a text adventure game, illustrating the location 
+described below. Show the location only - do NOT include any characters (human 
+or otherwise), and do not add objects that are not in the description.
+""",
+        direct_item_prompt="""\
+A supplementary image for a text adventure game, illustrating the item described
+below.
+""",
+        direct_npc_prompt="""\
+A supplementary image for a text adventure game, illustrating the character 
+described below.
 """
     )
\ No newline at end of file
@@ -1,15 +1,15 @@
 from dataclasses import dataclass, field
 from typing import Optional
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Criteria:
     """A criteria that evaluates to true or false based on the game state"""
-    requires_flags: set[str] = field(default_factory=set)
-    blocking_flags: set[str] = field(default_factory=set)
-    requires_inventory: set[str] = field(default_factory=set)
-    requires_companions: set[str] = field(default_factory=set)
+    requires_flags: frozenset[str] = field(default_factory=frozenset)
+    blocking_flags: frozenset[str] = field(default_factory=frozenset)
+    requires_inventory: frozenset[str] = field(default_factory=frozenset)
+    requires_companions: frozenset[str] = field(default_factory=frozenset)
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ConditionalText:
     """Text that is (only) displayed when a criteria is met"""
     text: str
@@ -19,14 +19,14 @@ class ConditionalText:
 # Can be a regular string, or list of ConditionalText objects to evaluate.
 ResolvableText = str | list[ConditionalText | str]
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Effect:
     """
     An effect changes the game state in some way(s).
     For example, setting or clearing flags.
     """
-    set_flags: set[str] = field(default_factory=set)
-    clear_flags: set[str] = field(default_factory=set)
+    set_flags: frozenset[str] = field(default_factory=frozenset)
+    clear_flags: frozenset[str] = field(default_factory=frozenset)
     add_inventory: list[str] = field(default_factory=list)
     remove_inventory: list[str] = field(default_factory=list)
     add_companions: list[str] = field(default_factory=list)
@@ -1,26 +1,71 @@
+import atexit
+import hashlib
 import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
+from threading import RLock
+from typing import Optional
 from .engine import GameEngineState
 
 class GameStatePersister:
     def __init__(self, world_base_folder: Path):
         self.saves_folder = get_world_sub_folder_path(world_base_folder, "saves")
 
+        # Save files are written in the background. A single worker keeps 
+        # writes in order. Pending writes are flushed on exit.
+        self.save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+        self.pending_saves: dict[Path, Future] = {}
+        self.save_lock = RLock()                    # (Re-entered by save_done when a pending save is cancelled)
+        atexit.register(self.save_executor.shutdown, wait=True)
+
+        # Hash of the state last written to each save file
+        self.saved_hashes: dict[Path, bytes] = {}
+
     def get_save_file_path(self, filename: str) -> Path:
         return get_world_file_path(self.saves_folder, filename, ".json")
 
     def save_game_state(self, state: GameEngineState, filename: str):
         save_file_path = self.get_save_file_path(filename)
 
-        # Serialize game state
-        state_json = json.dumps(state_to_dict(state), indent=2)
-
-        # Write to file
-        print(f"(Saving to: {save_file_path})")
-        save_file_path.write_text(state_json)
+        # Serialize game state (compact, as save files aren't meant to be hand edited)
+        state_json = json.dumps(state_to_dict(state), separators=(",", ":"))
+
+        # Skip the write if the file already holds (or is about to hold) this state
+        state_hash = hashlib.blake2b(state_json.encode("utf-8"), digest_size=16).digest()
+        # (Checked, cancelled and queued under one lock, so concurrent saves to
+        # the same file are queued in the order they were made)
+        with self.save_lock:
+            pending = self.pending_saves.get(save_file_path)
+            if self.saved_hashes.get(save_file_path) == state_hash and (pending or save_file_path.exists()):
+                return
+            self.saved_hashes[save_file_path] = state_hash
+
+            print(f"(Saving to: {save_file_path})")
+
+            # Write to file. A newer save to the same file supersedes a pending one.
+            future = self.save_executor.submit(write_file_atomic, save_file_path, state_json)
+            self.pending_saves[save_file_path] = future
+            if pending:
+                pending.cancel()
+            future.add_done_callback(lambda f: self.save_done(f, save_file_path))
+
+    def save_done(self, future: Future, save_file_path: Path):
+        failed = not future.cancelled() and future.exception() is not None
+        if failed:
+            print(f"(Failed to save to: {save_file_path}: {future.exception()})")
+
+        # Only touch the entries if they still belong to this save (and not a 
+        # newer one)
+        with self.save_lock:
+            if self.pending_saves.get(save_file_path) is future:
+                del self.pending_saves[save_file_path]
+                if failed:
+                    self.saved_hashes.pop(save_file_path, None)
 
     def load_game_state(self, filename: str) -> GameEngineState:
         save_file_path = self.get_save_file_path(filename)
+        self.wait_for_save(save_file_path)
         if not save_file_path.exists():
             raise RuntimeError(f"Save '{filename}' does not exist.")
         
@@ -36,10 +81,22 @@ class GameStatePersister:
 
         return state
 
+    def wait_for_save(self, save_file_path: Path):
+        """Wait for a pending write of the save file, if there is one."""
+        with self.save_lock:
+            pending: Optional[Future] = self.pending_saves.get(save_file_path)
+        if pending:
+            # Write errors have already been reported by save_done
+            wait([pending])
+
+def write_file_atomic(file_path: Path, text: str):
+    """Write via a temporary file, so a crash mid-write can't corrupt an existing save"""
+    temp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+    temp_path.write_text(text)
+    os.replace(temp_path, file_path)
+
 def get_world_sub_folder_path(world_base_folder: Path, sub_folder: str) -> Path:
     path = world_base_folder / sub_folder
-    path.resolve()
-
     path.mkdir(parents=False, exist_ok=True)
 
     return path
@@ -56,19 +113,19 @@ def get_world_file_path(folder_path: Path, filename: str, ext: str) -> Path:
 def state_to_dict(state: GameEngineState) -> dict:
     return {
         "location_id": state.location_id,
-        "inventory": state.inventory,
-        "companions": state.companions,
-        "flags": list(state.flags),
-        "location_items": state.location_items,
-        "completed_interactions": list(state.completed_interactions)
+        "inventory": list(state.inventory),
+        "companions": list(state.companions),
+        "flags": sorted(state.flags),
+        "location_items": { loc_id: list(item_ids) for loc_id, item_ids in state.location_items.items() },
+        "completed_interactions": sorted(state.completed_interactions)
     }
 
 def state_from_dict(data: dict) -> GameEngineState:
     return GameEngineState(
         location_id=data["location_id"],
-        inventory=data["inventory"],
-        companions=data["companions"],
+        inventory=dict.fromkeys(data["inventory"]),
+        companions=dict.fromkeys(data["companions"]),
         flags=set(data["flags"]),
-        location_items=data["location_items"],
+        location_items={ loc_id: dict.fromkeys(item_ids) for loc_id, item_ids in data["location_items"].items() },
         completed_interactions=set(data["completed_interactions"])
     )
\ No newline at end of file
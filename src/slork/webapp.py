@@ -1,27 +1,44 @@
-from flask import Flask, render_template, request
+import os
+from flask import Flask, render_template, request, session
 from pathlib import Path
 from typing import Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from threading import Lock
 from .app import App
-from .args import parse_main_args
+from .args import create_main_arg_parser
 from .engine import ActionResult
 
 @dataclass
 class WebAppState:
-    image_url: Optional[str] = None
-    last_cmd: Optional[str] = None
+    """
+    State shared by all requests. There is a single game, shared by every 
+    player. (Only what each player last saw is kept in their session.)
+    """
+    game_lock: Lock = field(default_factory=Lock)                            # The game engine is not thread safe
 
 def main() -> None:
 
     # Parse arguments
-    args = parse_main_args()
+    args = parse_web_app_args()
 
     # Create application
     app = App(args)
 
     # Create web application
     web_app = create_web_app(app, WebAppState())
-    web_app.run(debug=True)
+    try:
+        web_app.run(debug=args.debug)
+    finally:
+        app.shutdown()
+
+def parse_web_app_args():
+    parser = create_main_arg_parser()
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Run the web app with the Flask debugger and auto reloader"
+    )
+    return parser.parse_args()
 
 def create_web_app(app: App, state: WebAppState) -> Flask:
     
@@ -31,44 +48,55 @@ def create_web_app(app: App, state: WebAppState) -> Flask:
         static_url_path="/images"
     )
 
+    # Sign sessions with a configured key, so they survive restarts (and the 
+    # debug reloader). Otherwise fall back to a per-process key.
+    secret_key = os.environ.get("SLORK_SECRET_KEY")
+    if not secret_key:
+        print("(SLORK_SECRET_KEY not set. Sessions will reset when the server restarts.)")
+    web_app.secret_key = secret_key or os.urandom(24)
+
     @web_app.route("/", methods=["GET", "POST"])
     def index():
         # Perform command or display current location info
         engine_response: ActionResult
-        if request.method == "POST":
-            state.last_cmd = request.form["command"]
-            print(f"(Http POST > {state.last_cmd})")
-
-            app.base_engine.last_command = None
-            engine_response = app.handle_raw_command(state.last_cmd)
-        else:
-            print("(Http GET)")
-            engine_response = app.engine.get_intro()
+        with state.game_lock:
+            if request.method == "POST":
+                last_input = request.form["command"]
+                session["last_cmd"] = last_input
+                print(f"(Http POST > {last_input})")
+
+                app.base_engine.last_command = None
+                engine_response = app.handle_raw_command(last_input)
+            else:
+                print("(Http GET)")
+                last_input = session.get("last_cmd")
+                engine_response = app.engine.get_intro()
+            last_engine_cmd = app.base_engine.last_command
         
-        # Lookup image
+        # Lookup image. (Outside the game lock, as generating an image can take 
+        # seconds. The image service de-duplicates concurrent generations itself.)
         if engine_response.image_ref:
-            image_path = app.get_image(engine_response.image_ref)
-            state.image_url = fix_image_path(image_path)
+            session["image_url"] = fix_image_path(app.get_image(engine_response.image_ref))
 
         text = engine_response.message
 
         # Show last command
         # Use command passed to base engine, if available. Otherwise use command as keyed.
-        last_input = state.last_cmd
-        last_engine_cmd = app.base_engine.last_command
         if last_input or last_engine_cmd:
-            cmd_text = ""
+            lines: list[str] = []
             if last_input:
-                cmd_text += f"> {last_input}\n"
+                lines.append(f"> {last_input}")
             if last_engine_cmd:
-                cmd_text += f"({last_engine_cmd.raw})\n"
-            text = f"{cmd_text}\n{text}"
+                lines.append(f"({last_engine_cmd.raw})")
+            lines.append("")
+            lines.append(text)
+            text = "\n".join(lines)
 
         return render_template(
             "index.html",
             title=app.world.world.title,
             text=text,
-            image=state.image_url
+            image=session.get("image_url")
         )
 
     return web_app
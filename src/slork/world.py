@@ -1,14 +1,26 @@
+import sys
+from collections import deque
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Final, Optional
 from dacite import from_dict, Config
 import yaml
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader        # libyaml not available
 from .commands import VALID_VERBS
 from .logic import Criteria, Effect, ResolvableText, ConditionalText
 from .dialog import DialogTree
-from slork import dialog
 
-@dataclass
+# Verbs handled by the engine itself, which can't be used in interactions
+BUILT_IN_VERBS: Final = frozenset({ "look", "inventory", "go", "take", "drop", "examine" })
+
+# Verbs whose interactions can have a target
+TARGET_VERBS: Final = frozenset({ "use", "give" })
+
+@dataclass(slots=True)
 class Header:
     title: str
     start: str
@@ -16,35 +28,52 @@ class Header:
     initial_companions: list[str] = field(default_factory=list)
     intro_text: Optional[str] = None
 
-@dataclass
+    def __post_init__(self):
+        self.start = sys.intern(self.start)
+        self.initial_inventory = [sys.intern(item_id) for item_id in self.initial_inventory]
+        self.initial_companions = [sys.intern(npc_id) for npc_id in self.initial_companions]
+
+@dataclass(slots=True)
 class Item:
     name: str
     description: str
     location_description: Optional[ResolvableText] = None
     portable: bool = False
     aliases: list[str] = field(default_factory=list)
+    nouns: frozenset[str] = field(init=False, repr=False, compare=False)    # Casefolded name and aliases, for matching player input
 
-@dataclass
+    def __post_init__(self):
+        self.nouns = frozenset(sys.intern(noun.casefold()) for noun in [self.name, *self.aliases])
+
+@dataclass(slots=True)
 class Exit:
     to: str
     description: str
     criteria: Optional[Criteria] = None
     blocked_description: Optional[str] = None
 
-@dataclass
+    def __post_init__(self):
+        self.to = sys.intern(self.to)
+
+@dataclass(slots=True)
 class Location:
     name: str
     description: str
     exits: dict[str, Exit]
     items: list[str] = field(default_factory=list)
 
-@dataclass
+    def __post_init__(self):
+        # Directions are compared against parsed player commands
+        self.exits = { sys.intern(direction): exit for direction, exit in self.exits.items() }
+        self.items = [sys.intern(item_id) for item_id in self.items]
+
+@dataclass(slots=True)
 class NPC:
     persona: Optional[str] = None
     sample_lines: list[str] = field(default_factory=list)
     quest_hook: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Interaction:
     verb: str
     item: str
@@ -56,12 +85,19 @@ class Interaction:
     consumes: bool = False
     repeatable: bool = False
 
-@dataclass
+    def __post_init__(self):
+        # Verb, item and target form the engine's interaction lookup key
+        self.verb = sys.intern(self.verb)
+        self.item = sys.intern(self.item)
+        if self.target is not None:
+            self.target = sys.intern(self.target)
+
+@dataclass(slots=True)
 class AIGuidance:
     text_generation: Optional[str] = None
     image_generation: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class WorldValidationState:
 
     # Running list of issues found
@@ -75,7 +111,10 @@ class WorldValidationState:
     ref_flags: set[str] = field(default_factory=set)
     ref_items: set[str] = field(default_factory=set)
 
-@dataclass
+    # Dialog nodes by jump target, collected on the way (see World.get_dialog_jump_lookup)
+    dialog_jump_lookup: dict[str, DialogTree] = field(default_factory=dict)
+
+@dataclass(slots=True)
 class World:
     """
     A text adventure world definition, loaded from a yaml file.
@@ -87,8 +126,17 @@ class World:
     npcs: dict[str, NPC]
     interactions: dict[str, Interaction]
     ai_guidance: Optional[AIGuidance]
+    validation_issues: Optional[list[str]] = field(default=None, init=False, repr=False, compare=False)     # Cached result of validate()
+    dialog_jump_lookup: Optional[dict[str, DialogTree]] = field(default=None, init=False, repr=False, compare=False)
 
     def validate(self) -> list[str]:
+        # Worlds are treated as read-only (and shared by load_world), so only 
+        # need validating once
+        if self.validation_issues is None:
+            self.validation_issues = self.find_issues()
+        return list(self.validation_issues)
+
+    def find_issues(self) -> list[str]:
         state = WorldValidationState(
             issues=[],
             ref_flags=set(),
@@ -103,7 +151,12 @@ class World:
             if npc_id not in self.npcs:
                 state.issues.append(f"Initial companion '{npc_id}' was not found in the 'npcs' list.")
 
+        inventory_ids: set[str] = set()
         for item_id in self.world.initial_inventory:
+            if item_id in inventory_ids:
+                # Inventory is a set of item IDs, so duplicates would be silently dropped.
+                state.issues.append(f"Initial inventory item '{item_id}' is listed more than once.")
+            inventory_ids.add(item_id)
             state.ref_items.add(item_id)
             if item_id not in self.items:
                 state.issues.append(f"Initial inventory item '{item_id}' was not found in the 'items' list.")
@@ -121,7 +174,7 @@ class World:
                 state.ref_items.add(item_id)
                 if item_id not in self.items:
                     state.issues.append(f"Item '{item_id}' in location '{loc_id}' was not found in the 'items' list.")
-                if item_id in self.world.initial_inventory:
+                if item_id in inventory_ids:
                     state.issues.append(f"Item '{item_id}' in location '{loc_id}' is also in the initial inventory list.")
                 if item_id in item_locations:
                     state.issues.append(f"Item '{item_id}' in location '{loc_id}' is also in location '{item_locations[item_id]}'.")
@@ -146,7 +199,7 @@ class World:
                 self.validate_resolvable_text(item.location_description, state, f"Item '{item_id}' location_description")
 
         # NPCs
-        for npc_id, _ in self.npcs.items():
+        for npc_id in self.npcs:
             if npc_id not in self.items:
                 state.issues.append(f"NPC '{npc_id}' does not have a corresponding item in the 'items' list.")
 
@@ -154,11 +207,11 @@ class World:
         for x_id, x in self.interactions.items():
             if x.verb not in VALID_VERBS:
                 state.issues.append(f"Interaction '{x_id}' verb '{x.verb}' is not in the valid verbs list ({', '.join(VALID_VERBS)}).")
-            if x.verb in ["look", "inventory", "go", "take", "drop", "examine"]:
+            if x.verb in BUILT_IN_VERBS:
                 state.issues.append(f"Interaction '{x_id}' verb '{x.verb}' cannot be used in interactions.")
             if x.item not in self.items:
                 state.issues.append(f"Interaction '{x_id}' item '{x.item}' is was not found in the 'items' list.")
-            if x.target and x.verb not in ['use', 'give']:
+            if x.target and x.verb not in TARGET_VERBS:
                 state.issues.append(f"Interaction '{x_id}' verb '{x.verb}' has a target ('{x.target}'). Only verbs 'use' and 'give' support targets.")
 
             # Note: Not counting interaction references to items, as we are 
@@ -181,8 +234,8 @@ class World:
             if x.dialog and x.message:
                 state.issues.append(f"'{x_id}' interaction has a 'message' and a 'dialog' property.")
 
-        unref_flags = [ flag    for flag          in self.flags         if flag    not in state.ref_flags]
-        unref_items = [ item_id for item_id, item in self.items.items() if item_id not in state.ref_items]
+        unref_flags = sorted(self.flags - state.ref_flags)                 # (Flags are a set, so sort for a stable order)
+        unref_items = [ item_id for item_id in self.items if item_id not in state.ref_items]    # (World order)
         if unref_flags:
             state.issues.append(f"Unreferenced flags: {', '.join(unref_flags)}.")
         if unref_items:
@@ -195,52 +248,50 @@ class World:
         if unreferenced_jump_targets:
             state.issues.append(f"Unreferenced dialog jump targets: {', '.join(unreferenced_jump_targets)}")
 
-        # Find unreachable locations
-        unreachable = [ loc_id for loc_id, _ in self.locations.items() ]
-        queue = [ self.world.start ]
-        unreachable.remove(self.world.start)
-
-        while queue:
-            
-            # Remove location from queue
-            loc_id = queue[0]
-            queue.remove(loc_id)
-            loc = self.locations[loc_id]
-
-            # Scan exits
-            for _, ex in loc.exits.items():
-                if ex.to in unreachable:
-                    unreachable.remove(ex.to)
-                    queue.append(ex.to)
+        # Find unreachable locations (breadth first search from the start)
+        unreachable = dict.fromkeys(self.locations)         # (Ordered set)
+        if self.world.start in unreachable:
+            del unreachable[self.world.start]
+            queue = deque([ self.world.start ])
+            while queue:
+                loc = self.locations[queue.popleft()]
+
+                # Scan exits
+                for ex in loc.exits.values():
+                    if ex.to in unreachable:
+                        del unreachable[ex.to]
+                        queue.append(ex.to)
+        else:
+            state.issues.append(f"Start location '{self.world.start}' was not found in the 'locations' list.")
 
         if unreachable:
             state.issues.append(f"Unreachable locations: {', '.join(unreachable)}.")
 
+        self.dialog_jump_lookup = state.dialog_jump_lookup
         return state.issues
 
     def validate_criteria(self, criteria: Criteria, state: WorldValidationState, owner_desc: str):
 
-        for flag in criteria.requires_flags:
-            state.ref_flags.add(flag)
-            if flag not in self.flags:
-                state.issues.append(f"Required flag '{flag}' for {owner_desc} was not found in 'flags' list.")
+        # Flag and item sets are recorded as referenced in bulk, and missing 
+        # flags found by set difference
+        state.ref_flags |= criteria.requires_flags
+        for flag in criteria.requires_flags - self.flags:
+            state.issues.append(f"Required flag '{flag}' for {owner_desc} was not found in 'flags' list.")
 
-        for flag in criteria.blocking_flags:
-            state.ref_flags.add(flag)
-            if flag not in self.flags:
-                state.issues.append(f"Blocking flag '{flag}' for {owner_desc} was not found in 'flags' list.")
+        state.ref_flags |= criteria.blocking_flags
+        for flag in criteria.blocking_flags - self.flags:
+            state.issues.append(f"Blocking flag '{flag}' for {owner_desc} was not found in 'flags' list.")
 
+        state.ref_items |= criteria.requires_inventory
         for item_id in criteria.requires_inventory:
-            state.ref_items.add(item_id)
-            if item_id not in self.items:
+            item = self.items.get(item_id)
+            if item is None:
                 state.issues.append(f"Required item '{item_id}' for {owner_desc} was not found in 'items' list.")
-            else:
-                item = self.items[item_id]
-                if not item.portable:
-                    state.issues.append(f"Required item '{item_id}' ('{item.name}') for {owner_desc} is not portable.")
+            elif not item.portable:
+                state.issues.append(f"Required item '{item_id}' ('{item.name}') for {owner_desc} is not portable.")
 
+        state.ref_items |= criteria.requires_companions
         for npc_id in criteria.requires_companions:
-            state.ref_items.add(npc_id)
             if npc_id not in self.items:
                 state.issues.append(f"Required companion '{npc_id}' for {owner_desc} was not found in 'items' list.")
             if not npc_id in self.npcs:
@@ -248,105 +299,141 @@ class World:
 
     def validate_effect(self, effect: Effect, state: WorldValidationState, owner_desc: str):
 
-        for flag in effect.set_flags:
-            state.ref_flags.add(flag)
-            if flag not in self.flags:
-                state.issues.append(f"Flag to set '{flag}' for {owner_desc} was not found in 'flags' list.")
+        state.ref_flags |= effect.set_flags
+        for flag in effect.set_flags - self.flags:
+            state.issues.append(f"Flag to set '{flag}' for {owner_desc} was not found in 'flags' list.")
 
-        for flag in effect.clear_flags:
-            state.ref_flags.add(flag)
-            if flag not in self.flags:
-                state.issues.append(f"Flag to clear '{flag}' for {owner_desc} was not found in 'flags' list.")
-
-    def validate_conditional_text(self, text: ConditionalText | str, state: WorldValidationState, owner_desc: str):
-        if isinstance(text, ConditionalText) and text.criteria:
-            self.validate_criteria(text.criteria, state, f"{owner_desc} criteria for '{text.text}'")
+        state.ref_flags |= effect.clear_flags
+        for flag in effect.clear_flags - self.flags:
+            state.issues.append(f"Flag to clear '{flag}' for {owner_desc} was not found in 'flags' list.")
 
     def validate_resolvable_text(self, text: Optional[ResolvableText], state: WorldValidationState, owner_desc: str):
 
         if not text or isinstance(text, str):
             return
 
+        last_index = len(text)
         for i, clause in enumerate(text, 1):
             clause_desc = f"clause {i} of {owner_desc}"
 
-            self.validate_conditional_text(clause, state, clause_desc)
-            
-            if i < len(text) - 1 and (not isinstance(clause, ConditionalText) or not clause.criteria):
+            # Plain string clauses have no criteria
+            if isinstance(clause, ConditionalText) and clause.criteria:
+                self.validate_criteria(clause.criteria, state, f"{clause_desc} criteria for '{clause.text}'")
+                if i == last_index:
+                    state.issues.append(f"Last clause of resolvable text must not have a criteria in {owner_desc}")
+            elif i < last_index:
                 state.issues.append(f"{clause_desc} does not have a criteria. Subsequent clauses will never be considered.")
 
-        last_clause = text[-1]
-        if isinstance(last_clause, ConditionalText) and last_clause.criteria:
-            state.issues.append(f"Last clause of resolvable text must not have a criteria in {owner_desc}")
-
-    def validate_dialog_tree(self, tree: DialogTree, state: WorldValidationState, owner_desc: str):
-
-        # Must have narrative or be a jump (or both)
-        if not tree.jump and not tree.npc_narrative:
-            state.issues.append(f"{owner_desc} must have a 'npc_narrative' or a 'jump'.")
-
-        # Jumps should not have responses
-        if tree.jump and tree.responses:
-            state.issues.append(f"{owner_desc} cannot have 'responses' and a 'jump'.")
-
-        if tree.jump_target:
-            if tree.jump_target in state.dialog_jump_targets:
-                state.issues.append(f"{owner_desc} has a duplicate jump target.")
-            state.dialog_jump_targets.add(tree.jump_target)
-
-        if tree.jump:
-            self.validate_resolvable_text(tree.jump, state, f"{owner_desc} jump")
-            if isinstance(tree.jump, list):
-                state.dialog_jumps.update(
-                    clause if isinstance(clause, str) else clause.text
-                    for clause in tree.jump
-                )
-            else:
-                state.dialog_jumps.add(tree.jump)
-
-        if tree.npc_narrative:
-            self.validate_resolvable_text(tree.npc_narrative, state, f"{owner_desc} npc_narrative")
-
-        if tree.player_narrative:
-            self.validate_resolvable_text(tree.player_narrative, state, f"{owner_desc} player_narrative")
-
-        if tree.criteria:
-            self.validate_criteria(tree.criteria, state, f"{owner_desc} criteria")
-
-        if tree.effect:
-            self.validate_effect(tree.effect, state, f"{owner_desc} effect")
-
-        for response_id, response in tree.responses.items():
-            self.validate_dialog_tree(response, state, f"{owner_desc} > '{response_id}'")
+    def validate_dialog_tree(self, root: DialogTree, state: WorldValidationState, root_desc: str):
+
+        # Walk the tree in order using a stack, rather than recursion (trees can be deep)
+        stack: list[tuple[DialogTree, str]] = [(root, root_desc)]
+        while stack:
+            tree, owner_desc = stack.pop()
+
+            # Must have narrative or be a jump (or both)
+            if not tree.jump and not tree.npc_narrative:
+                state.issues.append(f"{owner_desc} must have a 'npc_narrative' or a 'jump'.")
+
+            # Jumps should not have responses
+            if tree.jump and tree.responses:
+                state.issues.append(f"{owner_desc} cannot have 'responses' and a 'jump'.")
+
+            if tree.jump_target:
+                if tree.jump_target in state.dialog_jump_targets:
+                    state.issues.append(f"{owner_desc} has a duplicate jump target.")
+                state.dialog_jump_targets.add(tree.jump_target)
+                state.dialog_jump_lookup[tree.jump_target] = tree
+
+            if tree.jump:
+                self.validate_resolvable_text(tree.jump, state, f"{owner_desc} jump")
+                if isinstance(tree.jump, list):
+                    state.dialog_jumps.update(
+                        clause if isinstance(clause, str) else clause.text
+                        for clause in tree.jump
+                    )
+                else:
+                    state.dialog_jumps.add(tree.jump)
+
+            if tree.npc_narrative:
+                self.validate_resolvable_text(tree.npc_narrative, state, f"{owner_desc} npc_narrative")
+
+            if tree.player_narrative:
+                self.validate_resolvable_text(tree.player_narrative, state, f"{owner_desc} player_narrative")
+
+            if tree.criteria:
+                self.validate_criteria(tree.criteria, state, f"{owner_desc} criteria")
+
+            if tree.effect:
+                self.validate_effect(tree.effect, state, f"{owner_desc} effect")
+
+            stack.extend(
+                (response, f"{owner_desc} > '{response_id}'")
+                for response_id, response in reversed(tree.responses.items())
+            )
     
     def get_dialog_jump_lookup(self) -> dict[str, DialogTree]:
+        # Validation builds the lookup as it walks the dialog trees
+        if self.dialog_jump_lookup is not None:
+            return self.dialog_jump_lookup
+
         lookup = dict()
 
         # Scan interactions for dialog
-        for _, i in self.interactions.items():
+        for i in self.interactions.values():
             if i.dialog:               
                 self.build_dialog_jump_lookup(i.dialog, lookup)
-                
+
+        self.dialog_jump_lookup = lookup
         return lookup
 
-    def build_dialog_jump_lookup(self, tree: DialogTree, lookup: dict[str, DialogTree]):
+    def build_dialog_jump_lookup(self, root: DialogTree, lookup: dict[str, DialogTree]):
 
-        # Recursively scan dialog tree for jump targets
-        if tree.jump_target:
-            lookup[tree.jump_target] = tree
-        if tree.responses:
-            for _, r in tree.responses.items():
-                self.build_dialog_jump_lookup(r, lookup)
+        # Scan dialog tree for jump targets, in order (using a stack rather than recursion)
+        stack = [root]
+        while stack:
+            tree = stack.pop()
+            if tree.jump_target:
+                lookup[tree.jump_target] = tree
+            if tree.responses:
+                stack.extend(reversed(tree.responses.values()))
 
 def load_world(path: Path) -> World:
-    world_yaml = path.read_text()
-    parsed_world = yaml.safe_load(world_yaml)
+    # Reuse the previously parsed world unless the file has changed. 
+    # (World objects are treated as read-only, so can be shared.)
+    stat = path.stat()
+    return load_world_file(path.resolve(), stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=8)
+def load_world_file(path: Path, mtime_ns: int, size: int) -> World:
+    return parse_world_file(path)
+
+def parse_world_file(path: Path) -> World:
+    world_yaml = path.read_bytes()                  # (Parser handles the decoding)
+    parsed_world = yaml.load(world_yaml, Loader=YamlLoader)
     config = Config(
         type_hooks={
             set: set,
-            set[str]: set,
+
+            # Intern IDs and flags, as they are used as lookup keys. (Other 
+            # text, such as descriptions, is left as is.)
+            set[str]: lambda value: set(intern_strings(value)),
+            frozenset[str]: lambda value: frozenset(intern_strings(value)),
+            dict[str, Item]: intern_keys,
+            dict[str, Location]: intern_keys,
+            dict[str, NPC]: intern_keys,
+            dict[str, Interaction]: intern_keys,
         }
     )
-    world = from_dict(World, parsed_world, config=config)
-    return world
-
+    return from_dict(World, parsed_world, config=config)
+
+def intern_strings(value: Any) -> Any:
+    # (Anything else is left for dacite to report)
+    if not isinstance(value, list) or not all(isinstance(s, str) for s in value):
+        return value
+    return [sys.intern(s) for s in value]
+
+def intern_keys(value: Any) -> Any:
+    if not isinstance(value, dict) or not all(isinstance(k, str) for k in value):
+        return value
+    return { sys.intern(k): v for k, v in value.items() }
@@ -0,0 +1,90 @@
+from pathlib import Path
+import pytest
+from slork.world import World, parse_world_file
+
+WORLD_YAML = """
+world:
+  title: Test World
+  start: hall
+
+ai_guidance:
+  image_generation: pencil sketch.
+
+flags:
+  - lamp_lit
+
+items:
+  lamp:
+    name: Lamp
+    description: An oil lamp.
+    location_description:
+      - text: A lit lamp glows on the table.
+        criteria:
+          requires_flags:
+            - lamp_lit
+      - An unlit lamp sits on the table.
+    portable: true
+  coin:
+    name: Coin
+    description: A copper coin.
+    location_description: A coin glints in the dust.
+    portable: true
+  switch:
+    name: Switch
+    description: A brass switch on the wall.
+
+locations:
+  hall:
+    name: Hall
+    description: A dusty hall.
+    exits:
+      north:
+        to: cellar
+        description: Stairs down into the dark.
+        criteria:
+          requires_flags:
+            - lamp_lit
+        blocked_description: It is too dark to go down.
+    items:
+      - lamp
+      - coin
+      - switch
+  cellar:
+    name: Cellar
+    description: A damp cellar.
+    exits:
+      south:
+        to: hall
+        description: Stairs back up.
+    items:
+      - coin
+
+npcs: {}
+
+interactions:
+  switch_on:
+    verb: open
+    item: switch
+    effect:
+      set_flags:
+        - lamp_lit
+    repeatable: true
+    message: Click. The lamp lights.
+  switch_off:
+    verb: close
+    item: switch
+    effect:
+      clear_flags:
+        - lamp_lit
+    repeatable: true
+    message: Click. The lamp goes out.
+"""
+
+@pytest.fixture
+def world_folder(tmp_path: Path) -> Path:
+    (tmp_path / "world.yaml").write_text(WORLD_YAML)
+    return tmp_path
+
+@pytest.fixture
+def world(world_folder: Path) -> World:
+    return parse_world_file(world_folder / "world.yaml")
@@ -0,0 +1,62 @@
+from slork.engine import ActionStatus, GameEngine, get_initial_game_state
+from slork.world import World
+
+def look(engine: GameEngine) -> str:
+    return engine.describe_current_location().message
+
+def test_take_and_drop_update_description(world: World):
+    engine = GameEngine(world)
+    assert "A coin glints in the dust." in look(engine)
+
+    engine.handle_raw_command("take coin")
+    assert "coin" not in look(engine).casefold()
+
+    engine.handle_raw_command("drop coin")
+    assert "A coin glints in the dust." in look(engine)
+
+def test_flag_changes_update_description(world: World):
+    engine = GameEngine(world)
+    assert "An unlit lamp sits on the table." in look(engine)
+
+    engine.handle_raw_command("open switch")
+    assert "A lit lamp glows on the table." in look(engine)
+
+    engine.handle_raw_command("close switch")
+    assert "An unlit lamp sits on the table." in look(engine)
+
+def test_flag_changes_update_exit_criteria(world: World):
+    engine = GameEngine(world)
+    assert engine.handle_raw_command("go north").status is ActionStatus.INVALID
+
+    engine.handle_raw_command("open switch")
+    assert engine.handle_raw_command("go north").status is ActionStatus.OK
+    engine.handle_raw_command("go south")
+
+    engine.handle_raw_command("close switch")
+    assert engine.handle_raw_command("go north").status is ActionStatus.INVALID
+
+def test_replacing_state_clears_caches(world: World):
+    engine = GameEngine(world)
+    engine.handle_raw_command("open switch")
+    engine.handle_raw_command("take coin")
+    assert engine.handle_raw_command("go north").status is ActionStatus.OK
+    engine.handle_raw_command("go south")
+    look(engine)
+
+    # (As when loading a save)
+    engine.state = get_initial_game_state(world)
+    assert "An unlit lamp sits on the table." in look(engine)
+    assert "A coin glints in the dust." in look(engine)
+    assert engine.handle_raw_command("go north").status is ActionStatus.INVALID
+
+def test_item_placed_in_two_locations(world: World):
+    # (The fixture world places the coin in the hall and the cellar)
+    engine = GameEngine(world)
+    engine.handle_raw_command("open switch")
+    assert engine.handle_raw_command("take coin").status is ActionStatus.OK
+    assert "coin" in engine.state.location_items["cellar"]
+
+    engine.handle_raw_command("go north")
+    assert "A coin glints in the dust." in look(engine)
+    assert engine.handle_raw_command("take coin").status is ActionStatus.OK
+    assert "coin" not in engine.state.location_items["cellar"]
@@ -0,0 +1,95 @@
+from pathlib import Path
+from typing import Optional
+from slork.ai_client import AIImageGen, NormalisedAIChatMessage
+from slork.images import ImageService
+from slork.world import World
+
+class FakeImageGen:
+    def __init__(self):
+        self.prompts: list[str] = []
+
+    def generate_png(self, prompt: str, filename: Path):
+        self.prompts.append(prompt)
+        filename.write_bytes(prompt.encode("utf-8"))
+
+class FakeChatClient:
+    def __init__(self):
+        self.calls = 0
+
+    def chat(self, messages: list[NormalisedAIChatMessage]) -> NormalisedAIChatMessage:
+        # (A different prompt each call, like a real chat model)
+        self.calls += 1
+        return NormalisedAIChatMessage("assistant", f"prompt {self.calls} for: {messages[-1].content}")
+
+    def get_image_generator(self) -> Optional[AIImageGen]:
+        return None
+
+def create_service(world: World, world_folder: Path, direct_prompts: bool = False) -> tuple[ImageService, FakeImageGen, FakeChatClient]:
+    image_gen = FakeImageGen()
+    chat_client = FakeChatClient()
+    service = ImageService(image_gen, chat_client, world, world_folder, direct_prompts=direct_prompts)
+    return service, image_gen, chat_client
+
+def test_image_generated_once(world: World, world_folder: Path):
+    service, image_gen, _ = create_service(world, world_folder)
+    image_path = service.get_location_image("hall")
+    assert image_path.exists()
+    assert len(image_gen.prompts) == 1
+
+    # Hit
+    assert service.get_location_image("hall") == image_path
+    assert len(image_gen.prompts) == 1
+
+def test_image_cache_survives_restart(world: World, world_folder: Path):
+    service, _, _ = create_service(world, world_folder)
+    image_path = service.get_location_image("hall")
+
+    # Fingerprint is persisted, so the image is still current
+    service, image_gen, chat_client = create_service(world, world_folder)
+    assert service.get_location_image("hall") == image_path
+    assert image_gen.prompts == []
+
+    # Same generator input is copied from the cache, without asking the chat 
+    # model again
+    image_path.unlink()
+    assert service.get_location_image("hall").exists()
+    assert image_gen.prompts == []
+    assert chat_client.calls == 0
+
+def test_changed_description_regenerates(world: World, world_folder: Path):
+    service, image_gen, _ = create_service(world, world_folder)
+    service.get_location_image("hall")
+
+    world.locations["hall"].description = "A freshly swept hall."
+    service.get_location_image("hall")
+    assert len(image_gen.prompts) == 2
+    assert "freshly swept" in image_gen.prompts[-1]
+
+def test_switching_prompt_mode_keeps_images(world: World, world_folder: Path):
+    service, _, _ = create_service(world, world_folder)
+    service.get_location_image("hall")
+
+    service, image_gen, _ = create_service(world, world_folder, direct_prompts=True)
+    service.get_location_image("hall")
+    assert image_gen.prompts == []
+
+def test_damaged_fingerprints_file_is_ignored(world: World, world_folder: Path):
+    service, _, _ = create_service(world, world_folder)
+    service.get_location_image("hall")
+    service.fingerprints_path.write_text("{ not json")
+
+    service, _, _ = create_service(world, world_folder)
+    assert service.fingerprints == {}
+    assert service.get_location_image("hall").exists()
+
+def test_chat_prompt_reused_for_same_description(world: World, world_folder: Path):
+    service, _, chat_client = create_service(world, world_folder)
+    system_prompt = service.prompts.create_location_prompt
+    direct_prompt = service.prompts.direct_location_prompt
+
+    prompt = service.get_image_gen_prompt(system_prompt, direct_prompt, "A dusty hall.")
+    assert service.get_image_gen_prompt(system_prompt, direct_prompt, "A dusty hall.") == prompt
+    assert chat_client.calls == 1
+
+    service.get_image_gen_prompt(system_prompt, direct_prompt, "A damp cellar.")
+    assert chat_client.calls == 2
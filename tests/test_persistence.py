@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+import pytest
+from slork.engine import GameEngine
+from slork.persistence import GameStatePersister
+from slork.world import World
+
+@pytest.fixture
+def engine(world: World) -> GameEngine:
+    engine = GameEngine(world)
+    for command in ["open switch", "take coin", "take lamp", "go north"]:
+        engine.handle_raw_command(command)
+    return engine
+
+def test_save_load_round_trip(engine: GameEngine, world: World, world_folder: Path):
+    persister = GameStatePersister(world_folder)
+    persister.save_game_state(engine.state, "slot1")
+    loaded = persister.load_game_state("slot1")
+    assert loaded == engine.state
+
+    # Loaded state is fully usable
+    engine.state = loaded
+    assert "A coin glints in the dust." in engine.describe_current_location().message
+    engine.handle_raw_command("drop lamp")
+    assert "lamp" in engine.state.location_items["cellar"]
+
+def test_save_file_is_compact(engine: GameEngine, world_folder: Path):
+    persister = GameStatePersister(world_folder)
+    persister.save_game_state(engine.state, "slot1")
+    save_file_path = persister.get_save_file_path("slot1")
+    persister.wait_for_save(save_file_path)
+
+    state_json = save_file_path.read_text()
+    assert "\n" not in state_json and ": " not in state_json
+    assert json.loads(state_json)["location_id"] == "cellar"
+
+def test_unchanged_state_is_not_rewritten(engine: GameEngine, world_folder: Path, capsys: pytest.CaptureFixture[str]):
+    persister = GameStatePersister(world_folder)
+    persister.save_game_state(engine.state, "slot1")
+    persister.save_game_state(engine.state, "slot1")
+    assert capsys.readouterr().out.count("(Saving to:") == 1
+
+    # Changed state is written
+    engine.handle_raw_command("go south")
+    persister.save_game_state(engine.state, "slot1")
+    assert capsys.readouterr().out.count("(Saving to:") == 1
+    assert persister.load_game_state("slot1").location_id == "hall"
+
+    # As is a save file that has gone missing
+    save_file_path = persister.get_save_file_path("slot1")
+    save_file_path.unlink()
+    persister.save_game_state(engine.state, "slot1")
+    persister.wait_for_save(save_file_path)
+    assert save_file_path.exists()
+
+def test_latest_save_wins(engine: GameEngine, world_folder: Path):
+    persister = GameStatePersister(world_folder)
+    for command in ["go south", "go north", "go south"]:
+        engine.handle_raw_command(command)
+        persister.save_game_state(engine.state, "slot1")
+    assert persister.load_game_state("slot1").location_id == "hall"
@@ -0,0 +1,58 @@
+from pathlib import Path
+from typing import Any, Callable
+import yaml
+from conftest import WORLD_YAML
+from slork.world import World, parse_world_file
+
+def load_modified_world(tmp_path: Path, modify: Callable[[dict[str, Any]], None]) -> World:
+    world_dict = yaml.safe_load(WORLD_YAML)
+    modify(world_dict)
+    path = tmp_path / "modified.yaml"
+    path.write_text(yaml.safe_dump(world_dict))
+    return parse_world_file(path)
+
+def set_lamp_description(description: list) -> Callable[[dict[str, Any]], None]:
+    def modify(world_dict: dict[str, Any]):
+        world_dict["items"]["lamp"]["location_description"] = description
+    return modify
+
+def lit(text: str) -> dict[str, Any]:
+    return { "text": text, "criteria": { "requires_flags": ["lamp_lit"] } }
+
+def test_fixture_world_issues(world: World):
+    assert world.validate() == ["Item 'coin' in location 'cellar' is also in location 'hall'."]
+
+def test_clause_without_criteria_before_last(tmp_path: Path):
+    world = load_modified_world(tmp_path, set_lamp_description([lit("One."), "Two.", "Three."]))
+    assert world.validate()[1:] == [
+        "clause 2 of Item 'lamp' location_description does not have a criteria. Subsequent clauses will never be considered."
+    ]
+
+def test_first_clause_without_criteria(tmp_path: Path):
+    world = load_modified_world(tmp_path, set_lamp_description(["One.", lit("Two."), "Three."]))
+    assert world.validate()[1:] == [
+        "clause 1 of Item 'lamp' location_description does not have a criteria. Subsequent clauses will never be considered."
+    ]
+
+def test_last_clause_with_criteria(tmp_path: Path):
+    world = load_modified_world(tmp_path, set_lamp_description([lit("One."), lit("Two.")]))
+    assert world.validate()[1:] == [
+        "Last clause of resolvable text must not have a criteria in Item 'lamp' location_description"
+    ]
+
+def test_unreachable_location(tmp_path: Path):
+    def modify(world_dict: dict[str, Any]):
+        world_dict["locations"]["attic"] = {
+            "name": "Attic",
+            "description": "A cramped attic.",
+            "exits": { "down": { "to": "hall", "description": "A ladder down." } },
+        }
+    world = load_modified_world(tmp_path, modify)
+    assert world.validate()[1:] == ["Unreachable locations: attic."]
+
+def test_one_way_exit_is_allowed(tmp_path: Path):
+    def modify(world_dict: dict[str, Any]):
+        del world_dict["locations"]["cellar"]["exits"]["south"]
+        world_dict["locations"]["cellar"]["exits"]["tunnel"] = { "to": "cellar", "description": "A tunnel that loops back." }
+    world = load_modified_world(tmp_path, modify)
+    assert world.validate()[1:] == []